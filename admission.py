@@ -0,0 +1,104 @@
+import asyncio
+import math
+import time
+from typing import Dict
+import metrics
+
+class Overloaded(Exception):
+    """Raised when a request cannot be admitted; maps onto an HTTP error."""
+
+    def __init__(self, status_code: int, retry_after: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.detail = detail
+
+class Ticket:
+    """A held concurrency slot. Releasing it more than once is a no-op."""
+
+    def __init__(self, controller: "AdmissionController"):
+        self._controller = controller
+        self._start = time.monotonic()
+        self._released = False
+
+    def release(self):
+        if self._released:
+            return
+        self._released = True
+        self._controller._release(time.monotonic() - self._start)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self.release()
+
+class AdmissionController:
+    """Caps concurrent chats and sheds load instead of queueing forever.
+
+    At most `max_concurrent` requests run at once and at most `max_queue`
+    wait for a slot. A full queue is rejected immediately with 429; a
+    request that waits longer than `queue_timeout` seconds gets 503.
+    """
+
+    def __init__(self, max_concurrent: int = 16, max_queue: int = 64, queue_timeout: float = 10.0):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        # Moving average of how long a slot is held, used for Retry-After
+        self.avg_service_time = 1.0
+
+    def _retry_after(self) -> int:
+        backlog = (self.waiting + 1) / self.max_concurrent
+        return max(1, math.ceil(self.avg_service_time * backlog))
+
+    async def acquire(self) -> Ticket:
+        """Wait for a slot, or raise Overloaded if the queue is full or too slow."""
+        if self._semaphore.locked() and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise Overloaded(429, self._retry_after(), "Too many requests in flight, Sir. Please retry shortly.")
+
+        self.waiting += 1
+        start = time.monotonic()
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise Overloaded(503, self._retry_after(), "Jarvis is at capacity, Sir. Please retry shortly.")
+        finally:
+            self.waiting -= 1
+
+        wait = time.monotonic() - start
+        metrics.ADMISSION_WAIT.observe(wait)
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+        self.admitted += 1
+        self.active += 1
+        return Ticket(self)
+
+    def _release(self, service_time: float):
+        self.active -= 1
+        self.avg_service_time = 0.9 * self.avg_service_time + 0.1 * service_time
+        self._semaphore.release()
+
+    def stats(self) -> Dict:
+        return {
+            "active": self.active,
+            "waiting": self.waiting,
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+            "avg_wait": self.total_wait / self.admitted if self.admitted else 0.0,
+            "max_wait": self.max_wait,
+            "avg_service_time": self.avg_service_time
+        }
@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for Jarvis
+Measures chat, memory, history and skill costs against a stubbed LLM and
+compares them with a stored baseline.
+
+    python benchmark.py                      # run and compare with benchmark_baseline.json
+    python benchmark.py --update-baseline    # record a new baseline
+
+Each benchmark group is bracketed by a fixed calibration workload whose
+time is stored with its results. Baseline timings are scaled by the ratio
+of the two calibration times before comparing, so a baseline recorded on
+one machine still works on slower, faster or busier hardware.
+"""
+
+import asyncio
+import gc
+import importlib
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import types
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional
+
+# Keep benchmark state out of the working tree; must happen before config is imported
+WORK_DIR = tempfile.mkdtemp(prefix="jarvis-bench-")
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+os.environ["HISTORY_LOG"] = os.path.join(WORK_DIR, "history.jsonl")
+os.environ["SESSION_DIR"] = os.path.join(WORK_DIR, "sessions")
+os.environ["LLM_CACHE_ENABLED"] = "false"
+
+import typer
+from rich.console import Console
+from rich.table import Table
+
+app = typer.Typer()
+console = Console()
+
+TOOL_TRIGGER = "add up"
+DESKTOP_MODULES = ("pygetwindow", "win32gui", "win32clipboard")
+
+# --- Stubbed LLM -----------------------------------------------------------
+
+def _message(content: Optional[str] = None, tool_calls: Optional[List] = None):
+    return SimpleNamespace(role="assistant", content=content, tool_calls=tool_calls)
+
+def _tool_call(call_id: str, name: str, arguments: str):
+    return SimpleNamespace(id=call_id, type="function", function=SimpleNamespace(name=name, arguments=arguments))
+
+class StubCompletions:
+    """Instant chat.completions stand-in.
+
+    A user message containing TOOL_TRIGGER gets one calculator tool call
+    before the answer, so a turn costs two LLM rounds and one tool call;
+    anything else is answered directly.
+    """
+
+    def __init__(self):
+        self.calls = 0
+
+    def _reply(self, messages: List[Dict]):
+        self.calls += 1
+        last = messages[-1]
+        if last["role"] == "user" and TOOL_TRIGGER in (last.get("content") or ""):
+            return _message(tool_calls=[_tool_call(f"call_{self.calls}", "calculator", '{"expression": "2 + 3"}')])
+        return _message(content="The answer is 5, Sir.")
+
+    def create(self, messages: List[Dict], stream: bool = False, **kwargs):
+        message = self._reply(messages)
+        if stream:
+            return iter(self._chunks(message))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+    @staticmethod
+    def _chunks(message) -> List:
+        if message.tool_calls:
+            deltas = [SimpleNamespace(content=None, tool_calls=[
+                SimpleNamespace(index=i, id=tc.id, function=tc.function) for i, tc in enumerate(message.tool_calls)
+            ])]
+        else:
+            deltas = [SimpleNamespace(content=word, tool_calls=None) for word in message.content.split(" ")]
+        return [SimpleNamespace(choices=[SimpleNamespace(delta=delta)]) for delta in deltas]
+
+class AsyncStubCompletions:
+    def __init__(self, completions: StubCompletions):
+        self.completions = completions
+
+    async def create(self, **kwargs):
+        result = self.completions.create(**kwargs)
+        if kwargs.get("stream"):
+            async def chunks():
+                for chunk in result:
+                    yield chunk
+            return chunks()
+        return result
+
+def stub_clients():
+    completions = StubCompletions()
+    client = SimpleNamespace(chat=SimpleNamespace(completions=completions))
+    async_client = SimpleNamespace(chat=SimpleNamespace(completions=AsyncStubCompletions(completions)), close=_noop)
+    return client, async_client
+
+async def _noop():
+    pass
+
+# --- Measurement -----------------------------------------------------------
+
+def summarize(latencies: List[float], wall: Optional[float] = None, **extra) -> Dict:
+    """Latency percentiles in ms and throughput in ops/s."""
+    latencies = sorted(latencies)
+    wall = wall if wall is not None else sum(latencies)
+    result = {
+        "n": len(latencies),
+        "p50_ms": round(statistics.median(latencies) * 1000, 4),
+        "p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))] * 1000, 4),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 4),
+        "ops_per_sec": round(len(latencies) / wall, 2) if wall else 0.0
+    }
+    result.update(extra)
+    return result
+
+def measure(fn: Callable[[], object], n: int, warmup: int = 3, repeat: int = 3) -> Dict:
+    """Time `n` calls, `repeat` times, and keep the quietest run (as timeit does)."""
+    for _ in range(warmup):
+        fn()
+    runs = []
+    for _ in range(repeat):
+        latencies = []
+        for _ in range(n):
+            start = time.perf_counter()
+            fn()
+            latencies.append(time.perf_counter() - start)
+        runs.append(summarize(latencies))
+    return min(runs, key=lambda run: run["p50_ms"])
+
+def calibrate(repeat: int = 5) -> float:
+    """Milliseconds this machine needs for a fixed pure-Python workload, best of `repeat`.
+
+    The garbage collector is off while timing (as in timeit), so the result
+    doesn't depend on how many objects earlier benchmarks left alive.
+    """
+    payload = [{"id": i, "text": f"message {i}", "tags": ["user", "jarvis"]} for i in range(500)]
+    best = float("inf")
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(20):
+                data = json.loads(json.dumps(payload))
+                data.sort(key=lambda d: d["text"])
+                sum(len(d["text"]) for d in data)
+            best = min(best, time.perf_counter() - start)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return round(best * 1000, 4)
+
+def _quiet():
+    """Silence per-call console output from the modules under test."""
+    import brain, memory
+    brain.console.quiet = True
+    memory.console.quiet = True
+
+# --- Benchmarks ------------------------------------------------------------
+
+def bench_think(n: int) -> Dict[str, Dict]:
+    from brain import Brain
+    from skills import CalculatorSkill, TimeSkill
+    client, async_client = stub_clients()
+    brain = Brain(client=client, async_client=async_client)
+    skills = {"calculator": CalculatorSkill(), "time": TimeSkill()}
+
+    results = {"think.direct": measure(lambda: brain.think("tell me something nice", skills), n)}
+    tool_turn = measure(lambda: brain.think(f"please {TOOL_TRIGGER} two and three", skills), n)
+    # Two LLM rounds per tool turn: per-iteration overhead is half the turn
+    tool_turn["per_iteration_ms"] = round(tool_turn["p50_ms"] / 2, 4)
+    results["think.tool_turn"] = tool_turn
+    results["think_stream.tool_turn"] = measure(
+        lambda: list(brain.think_stream(f"please {TOOL_TRIGGER} two and three", skills)), n
+    )
+    return results
+
+def bench_memory(entries: int, n: int) -> Dict[str, Dict]:
+    from memory import Memory
+    # Pre-fill to the target size through a memory.json, which also times the JSON -> SQLite migration
+    path = os.path.join(WORK_DIR, "memory.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({
+            "facts": {f"fact_{i}": {"value": f"value {i}", "timestamp": "2024-01-01T00:00:00"} for i in range(entries)},
+            "preferences": {},
+            "history": [{"entry": f"entry {i}", "timestamp": "2024-01-01T00:00:00"} for i in range(100)]
+        }, f)
+    start = time.perf_counter()
+    memory = Memory(path)
+    load_ms = round((time.perf_counter() - start) * 1000, 4)
+
+    counter = iter(range(10 ** 9))
+    results = {
+        "memory.remember_fact": measure(lambda: memory.remember_fact(f"new_{next(counter)}", "value"), n),
+        "memory.add_to_history": measure(lambda: memory.add_to_history(f"entry {next(counter)}"), n),
+        "memory.recall_fact": measure(lambda: memory.recall_fact(f"fact_{entries // 2}"), n * 100)
+    }
+    memory.close()
+    for result in results.values():
+        result["entries"] = entries
+    results["memory.writes"] = dict(memory.write_stats(), backend=type(memory.backend).__name__, load_ms=load_ms)
+    return results
+
+def bench_history(entries: int, n: int) -> Dict[str, Dict]:
+    from history_store import HistoryStore
+    store = HistoryStore(os.path.join(WORK_DIR, "bench_history.jsonl"))
+    for i in range(entries):
+        store.append("User" if i % 2 == 0 else "Jarvis", f"message {i}")
+    return {
+        "history.append": measure(lambda: store.append("User", "hello"), n),
+        "history.page_latest": measure(lambda: store.page(limit=50), n),
+        "history.page_middle": measure(lambda: store.page(before=entries // 2, limit=50), n)
+    }
+
+def bench_skills(n: int) -> Dict[str, Dict]:
+    from brain import Brain
+    from intent_router import IntentRouter
+    from skills import CalculatorSkill, TimeSkill
+    client, async_client = stub_clients()
+    brain = Brain(client=client, async_client=async_client)
+    skills = {"calculator": CalculatorSkill(), "time": TimeSkill()}
+    router = IntentRouter()
+    calls = [("call_1", "calculator", '{"expression": "2 + 3"}'), ("call_2", "time", '{"query": "time"}')]
+    return {
+        "skills.dispatch": measure(lambda: brain._run_tool_call("calculator", '{"expression": "2 + 3"}', skills), n * 10),
+        "skills.round_of_two": measure(lambda: brain._run_tool_calls(calls, skills), n),
+        "skills.intent_route": measure(lambda: router.route("what is 12 x 7", skills), n * 10)
+    }
+
+async def _drive(client_factory, request: Callable, concurrency: int, total: int) -> Dict:
+    latencies: List[float] = []
+    remaining = iter(range(total))
+
+    async def worker():
+        async with client_factory() as client:
+            for _ in remaining:
+                start = time.perf_counter()
+                response = await request(client)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - start, concurrency=concurrency)
+
+def _stub_desktop_modules():
+    """Empty stand-ins for the Windows-only modules server.py imports; no benchmark calls them."""
+    for name in DESKTOP_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            sys.modules[name] = types.ModuleType(name)
+
+def bench_server(concurrency: int, total: int) -> Dict[str, Dict]:
+    import httpx
+    _stub_desktop_modules()
+    # Importing server creates a Jarvis whose memory lives in the working directory,
+    # so import it from WORK_DIR (with an empty ui/ for the static mount)
+    os.makedirs(os.path.join(WORK_DIR, "ui"), exist_ok=True)
+    cwd = os.getcwd()
+    os.chdir(WORK_DIR)
+    try:
+        import server
+    except ImportError as e:
+        return {"server": {"skipped": f"server unavailable: {e}"}}
+    finally:
+        os.chdir(cwd)
+
+    client, async_client = stub_clients()
+    server.jarvis_ai.jarvis.brain.client = client
+    server.jarvis_ai.jarvis.brain.async_client = async_client
+
+    def client_factory():
+        return httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://bench")
+
+    async def run():
+        return {
+            "server.chat": await _drive(
+                client_factory, lambda c: c.post("/api/chat", json={"message": f"please {TOOL_TRIGGER} 2 and 3"}),
+                concurrency, total
+            ),
+            "server.history": await _drive(
+                client_factory, lambda c: c.get("/api/history", params={"limit": 50}), concurrency, total * 2
+            )
+        }
+    return asyncio.run(run())
+
+# --- Baseline comparison ---------------------------------------------------
+
+def scaled_baseline(result: Dict, before: Dict) -> Optional[float]:
+    """The baseline p50 adjusted to the speed this result was measured at."""
+    p50 = before.get("p50_ms")
+    if p50 and result.get("calibration_ms") and before.get("calibration_ms"):
+        p50 *= result["calibration_ms"] / before["calibration_ms"]
+    return p50
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], tolerance: float) -> List[str]:
+    """Benchmarks whose p50 got slower than the (scaled) baseline by more than `tolerance`."""
+    regressions = []
+    for name, result in results.items():
+        before = scaled_baseline(result, baseline.get(name, {}))
+        after = result.get("p50_ms")
+        if before and after and after > before * (1 + tolerance):
+            regressions.append(f"{name}: p50 {before:.3f}ms -> {after:.3f}ms (+{(after / before - 1) * 100:.0f}%)")
+    return regressions
+
+def print_results(results: Dict[str, Dict], baseline: Dict[str, Dict]):
+    table = Table(title="Jarvis benchmarks (baseline scaled to this run's calibration)")
+    for column in ("benchmark", "n", "p50 ms", "p95 ms", "ops/s", "baseline p50"):
+        table.add_column(column)
+    for name, result in results.items():
+        if "skipped" in result:
+            table.add_row(name, "-", "-", "-", "-", f"[yellow]{result['skipped']}[/yellow]")
+            continue
+        if "p50_ms" not in result:
+            # Counters rather than timings, e.g. memory write amplification
+            table.add_row(name, "-", "-", "-", "-", ", ".join(f"{k}={v}" for k, v in result.items()))
+            continue
+        before = scaled_baseline(result, baseline.get(name, {}))
+        table.add_row(name, str(result["n"]), f"{result['p50_ms']:.3f}", f"{result['p95_ms']:.3f}",
+                      f"{result['ops_per_sec']:.0f}", f"{before:.3f}" if before else "-")
+    console.print(table)
+
+@app.command()
+def main(
+    baseline_file: str = typer.Option("benchmark_baseline.json", "--baseline", help="Baseline to compare against"),
+    output: str = typer.Option("bench_results.json", "--output", "-o", help="Where to write this run's results"),
+    update_baseline: bool = typer.Option(False, "--update-baseline", help="Write results as the new baseline"),
+    tolerance: float = typer.Option(0.5, help="Allowed p50 slowdown before a benchmark counts as a regression"),
+    quick: bool = typer.Option(False, "--quick", help="Fewer iterations, for a fast sanity check"),
+    memory_entries: int = typer.Option(10000, help="Facts in memory for the memory benchmarks"),
+    concurrency: int = typer.Option(16, help="Concurrent clients for the server benchmarks")
+):
+    """Run the benchmark suite against a stubbed LLM."""
+    n = 20 if quick else 200
+    _quiet()
+
+    groups = [
+        lambda: bench_think(n),
+        lambda: bench_memory(memory_entries, max(10, n // 10)),
+        lambda: bench_history(memory_entries, n),
+        lambda: bench_skills(n),
+        lambda: bench_server(concurrency, n)
+    ]
+    results: Dict[str, Dict] = {}
+    for group in groups:
+        # Calibrating right around each group follows load changes during the run
+        before = calibrate()
+        group_results = group()
+        calibration_ms = round((before + calibrate()) / 2, 4)
+        for result in group_results.values():
+            if "p50_ms" in result:
+                result["calibration_ms"] = calibration_ms
+        results.update(group_results)
+
+    baseline = {}
+    if os.path.exists(baseline_file):
+        with open(baseline_file, 'r', encoding='utf-8') as f:
+            baseline = json.load(f).get("results", {})
+
+    print_results(results, baseline)
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "platform": sys.platform,
+        "quick": quick,
+        "results": results
+    }
+    with open(baseline_file if update_baseline else output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    if update_baseline:
+        console.print(f"[green]Baseline written to {baseline_file}[/green]")
+        return
+    regressions = compare(results, baseline, tolerance)
+    if regressions:
+        console.print("[red]Regressions against baseline:[/red]")
+        for regression in regressions:
+            console.print(f"  [red]{regression}[/red]")
+        raise typer.Exit(code=1)
+    console.print(f"[green]No regressions beyond {tolerance:.0%}. Results written to {output}[/green]")
+
+if __name__ == "__main__":
+    app()
@@ -1,64 +1,189 @@
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI, DefaultHttpxClient, DefaultAsyncHttpxClient
+import asyncio
+import concurrent.futures
+import httpx
 import json
-from typing import List, Dict, Optional
+import time
+from typing import Any, Callable, List, Dict, Optional, Iterator, AsyncIterator, Tuple, NamedTuple
 from config import settings
 from rich.console import Console
+import metrics
+from context import ContextBuilder
+from llm_cache import ResponseCache
+from intent_router import IntentRouter
+from prefetch import SearchPrefetcher
+from conversation import Conversation, Message
+from skills import tools_for
+from memory import Memory
+from compaction import EXPIRED_FULL_RESULT, ResultCompactor, parse_budgets
+from resilience import Deadline, DeadlineExceeded, is_transient, backoff_delay
 
 console = Console()
 
+# (tool_call_id, function name, JSON arguments) for one requested tool call
+ToolCall = Tuple[str, str, str]
+
+PROVIDER_URLS = {
+    "openai": None,
+    "openrouter": "https://openrouter.ai/api/v1"
+}
+
+class LLMEndpoint(NamedTuple):
+    """One model on one provider in the fallback chain."""
+    provider: str
+    model: str
+    client: OpenAI
+    async_client: AsyncOpenAI
+
 class Brain:
     """The reasoning engine powered by LLM."""
     
-    def __init__(self):
-        if not settings.OPENAI_API_KEY:
-            console.print("[yellow]Warning: OPENAI_API_KEY not set. Brain will not function.[/yellow]")
+    # Shared by every Brain so parallel tool calls don't each spawn a pool
+    _tool_executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=settings.TOOL_MAX_WORKERS, thread_name_prefix="jarvis-tool"
+    )
+    _router = IntentRouter()
+    # Speculative searches get their own threads so a tool round never waits behind them
+    _prefetcher = SearchPrefetcher(
+        concurrent.futures.ThreadPoolExecutor(max_workers=settings.TOOL_MAX_WORKERS, thread_name_prefix="jarvis-prefetch"),
+        settings.PREFETCH_MATCH_THRESHOLD
+    ) if settings.SPECULATIVE_SEARCH else None
+    # Clients for fallback providers, created on first use and shared
+    _provider_clients: Dict[str, Tuple[OpenAI, AsyncOpenAI]] = {}
+    # Opt-in and shared, so repeated questions from different sessions hit it
+    _response_cache = ResponseCache(
+        settings.LLM_CACHE_MAX_ENTRIES, settings.LLM_CACHE_TTL, settings.LLM_CACHE_DISK_PATH or None
+    ) if settings.LLM_CACHE_ENABLED else None
+    
+    def __init__(self, client: Optional[OpenAI] = None, async_client: Optional[AsyncOpenAI] = None,
+                 spill: Optional[Callable[[str, str], Any]] = None, memory: Optional[Memory] = None):
+        # Brains for different sessions can share clients and their connection pools
+        if client is None or async_client is None:
+            if not settings.OPENAI_API_KEY:
+                console.print("[yellow]Warning: OPENAI_API_KEY not set. Brain will not function.[/yellow]")
+            elif settings.LLM_BASE_URL:
+                console.print(f"[dim]Using LLM endpoint {settings.LLM_BASE_URL}[/dim]")
+            elif self._provider_base_url():
+                console.print("[dim]OpenRouter provider detected.[/dim]")
+        if client is None:
+            client = self._create_client()
+        if async_client is None:
+            async_client = self._create_async_client()
+            
+        self.client = client
+        self.async_client = async_client
+        self.model = settings.LLM_MODEL
+        self.temperature = 0.7
+        # Bounded; turns that age out go to `spill` (e.g. HistoryStore.append)
+        self.conversation_history = Conversation(
+            settings.CONVERSATION_MAX_MESSAGES, settings.CONVERSATION_MAX_BYTES, spill
+        )
+        self.system_prompt = self._build_system_prompt()
+        self.context_builder = ContextBuilder(settings.CONTEXT_MAX_TOKENS, model=self.model)
+        self.compactor = ResultCompactor(settings.TOOL_RESULT_MAX_TOKENS, parse_budgets(settings.TOOL_RESULT_BUDGETS),
+                                         model=self.model)
+        self.last_prompt_tokens = 0
+        self.endpoints = self._build_endpoints()
+        self._prefetch = None
+        # Long-term memory; its most relevant entries are added to each prompt
+        self.memory = memory
+        self._memory_prompt: Tuple[Optional[str], str] = (None, self.system_prompt)
         
+    @staticmethod
+    def _provider_base_url() -> Optional[str]:
+        # Explicit endpoint, e.g. stub_server.py for offline benchmarks
+        if settings.LLM_BASE_URL:
+            return settings.LLM_BASE_URL
         # Check if it's an OpenRouter key
-        base_url = None
         if settings.OPENAI_API_KEY and settings.OPENAI_API_KEY.startswith("sk-or-"):
-            base_url = "https://openrouter.ai/api/v1"
-            console.print("[dim]OpenRouter provider detected.[/dim]")
-            
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY, base_url=base_url)
-        self.conversation_history: List[Dict[str, str]] = []
-        self.system_prompt = self._build_system_prompt()
+            return PROVIDER_URLS["openrouter"]
+        return None
+        
+    @classmethod
+    def _primary_provider(cls) -> str:
+        return "openrouter" if cls._provider_base_url() == PROVIDER_URLS["openrouter"] else "openai"
+        
+    @classmethod
+    def _clients_for(cls, provider: str) -> Tuple[OpenAI, AsyncOpenAI]:
+        """Shared clients for a fallback provider."""
+        if provider not in cls._provider_clients:
+            api_key = settings.OPENAI_API_KEY
+            if provider == "openrouter" and settings.OPENROUTER_API_KEY:
+                api_key = settings.OPENROUTER_API_KEY
+            base_url = PROVIDER_URLS[provider]
+            cls._provider_clients[provider] = (
+                cls._create_client(api_key, base_url), cls._create_async_client(api_key, base_url)
+            )
+        return cls._provider_clients[provider]
+        
+    def _build_endpoints(self) -> List[LLMEndpoint]:
+        """The primary model followed by LLM_FALLBACK_MODELS.
+        
+        Entries are "model" (same provider as the primary) or "provider:model",
+        e.g. "gpt-4o-mini, openrouter:mistralai/mistral-7b-instruct".
+        """
+        primary = self._primary_provider()
+        endpoints = [LLMEndpoint(primary, self.model, self.client, self.async_client)]
+        for entry in filter(None, (e.strip() for e in settings.LLM_FALLBACK_MODELS.split(","))):
+            provider, _, model = entry.partition(":")
+            if provider not in PROVIDER_URLS or not model:
+                provider, model = primary, entry
+            if provider == primary:
+                endpoints.append(LLMEndpoint(provider, model, self.client, self.async_client))
+            else:
+                endpoints.append(LLMEndpoint(provider, model, *self._clients_for(provider)))
+        return endpoints
+        
+    @staticmethod
+    def _http_limits() -> httpx.Limits:
+        """Connection pool shared by every request made through one client."""
+        return httpx.Limits(
+            max_connections=settings.LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_MAX_KEEPALIVE,
+            keepalive_expiry=settings.LLM_KEEPALIVE_EXPIRY
+        )
+        
+    # Retries are handled by _complete() so they can respect the request deadline
+    @classmethod
+    def _create_client(cls, api_key: Optional[str] = None, base_url: Optional[str] = None) -> OpenAI:
+        return OpenAI(
+            api_key=api_key or settings.OPENAI_API_KEY,
+            base_url=base_url or cls._provider_base_url(),
+            max_retries=0,
+            http_client=DefaultHttpxClient(limits=cls._http_limits())
+        )
+        
+    @classmethod
+    def _create_async_client(cls, api_key: Optional[str] = None, base_url: Optional[str] = None) -> AsyncOpenAI:
+        return AsyncOpenAI(
+            api_key=api_key or settings.OPENAI_API_KEY,
+            base_url=base_url or cls._provider_base_url(),
+            max_retries=0,
+            http_client=DefaultAsyncHttpxClient(limits=cls._http_limits())
+        )
         
     def _build_system_prompt(self) -> str:
         """Define Jarvis's personality and capabilities."""
         return """You are Jarvis, a highly intelligent personal AI assistant.
 You are helpful, concise, and proactive. You have access to real-time information via Google and other search engines.
 You can remember facts about the user, control their computer, answer questions, and assist with tasks using your skills.
-When a user asks for real-time data or something that requires current facts, use your 'google_search' tool immediately.
+When a user asks for real-time data or something that requires current facts, use your search tool immediately.
 Always be respectful and efficient. Keep responses conversational and natural."""
 
-    def _get_tools_definition(self) -> List[Dict]:
-        """Define the tools available to Jarvis."""
-        return [
+    def _get_tools_definition(self, skills: Dict = None) -> List[Dict]:
+        """Define the tools available to Jarvis: the skills' own definitions plus Brain's built-ins."""
+        return tools_for(skills) + [
             {
                 "type": "function",
                 "function": {
-                    "name": "web_search",
-                    "description": "Search the internet for real-time information and facts.",
+                    "name": "get_tool_result",
+                    "description": "Read the full text of an earlier tool result that was truncated, by its ref.",
                     "parameters": {
                         "type": "object",
                         "properties": {
-                            "query": {"type": "string", "description": "The search query."}
+                            "ref": {"type": "string", "description": "The ref given in the truncated result."}
                         },
-                        "required": ["query"]
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "google_search",
-                    "description": "Perform an advanced Google search for precise real-time information and specific URLs.",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "query": {"type": "string", "description": "The search query."}
-                        },
-                        "required": ["query"]
+                        "required": ["ref"]
                     }
                 }
             },
@@ -86,60 +211,563 @@ Always be respectful and efficient. Keep responses conversational and natural.""
             }
         ]
 
-    def think(self, user_input: str, skills: Dict = None) -> str:
-        """Process user input and generate a response, potentially using tools."""
+    def _build_messages(self, tools: List[Dict] = None) -> List[Dict]:
+        """Assemble the prompt for the next round within the context token budget."""
+        messages, tokens = self.context_builder.build(self._system_prompt_with_memory(), self.conversation_history, tools)
+        self.last_prompt_tokens = tokens
+        metrics.PROMPT_TOKENS.observe(tokens)
+        return [m.to_dict() if isinstance(m, Message) else m for m in messages]
+
+    def _system_prompt_with_memory(self) -> str:
+        """System prompt plus the top-k memories relevant to the latest user message."""
+        if self.memory is None:
+            return self.system_prompt
+        query = next((m.content for m in reversed(self.conversation_history) if m.role == "user"), None)
+        # Tool rounds within a turn reuse the lookup
+        if query is None or query == self._memory_prompt[0]:
+            return self._memory_prompt[1]
+        memories = self.memory.relevant(query, settings.MEMORY_TOP_K)
+        prompt = self.system_prompt
+        if memories:
+            prompt += "\n\nThings you remember about the user (use them when relevant):\n" + "\n".join(
+                f"- {m}" for m in memories
+            )
+        self._memory_prompt = (query, prompt)
+        return prompt
+
+    def _run_tool_call(self, function_name: str, arguments: str, skills: Dict = None) -> str:
+        """Execute one tool call requested by the model."""
+        args = json.loads(arguments) if arguments else {}
+        
+        console.print(f"[dim]Executing tool: {function_name}({args})[/dim]")
+        
+        if self._prefetcher is not None:
+            prefetched = self._prefetcher.take(self._prefetch, function_name, arguments, settings.TOOL_TIMEOUT)
+            if prefetched is not None:
+                return prefetched
+        if function_name == "get_tool_result":
+            return self.compactor.get(args.get("ref", ""))
+        if skills and function_name in skills:
+            with metrics.TOOL_LATENCY.time(tool=function_name):
+                return str(skills[function_name].execute(**args))
+        return f"Error: Tool {function_name} not found."
+
+    def _start_prefetch(self, user_input: str, skills: Dict = None):
+        """Start this turn's speculative search, dropping last turn's if unused."""
+        if self._prefetcher is None:
+            return
+        self._prefetcher.discard(self._prefetch)
+        self._prefetch = self._prefetcher.start(user_input, skills)
+
+    def _cached_answer(self, messages: List[Dict], tools: List[Dict]) -> Optional[str]:
+        if self._response_cache is None:
+            return None
+        return self._response_cache.get(self.model, messages, tools, self.temperature)
+
+    def _cache_answer(self, messages: List[Dict], tools: List[Dict], content: str):
+        if self._response_cache is not None:
+            self._response_cache.put(self.model, messages, tools, self.temperature, content)
+
+    def _complete(self, deadline: Deadline, **kwargs):
+        """chat.completions.create with jittered retries and the model fallback chain.
+        
+        Transient errors are retried on the same endpoint up to LLM_MAX_RETRIES
+        times; anything else, or running out of retries, moves on to the next
+        endpoint. No attempt or backoff may run past the deadline.
+        """
+        last_error = None
+        for i, endpoint in enumerate(self.endpoints):
+            for attempt in range(settings.LLM_MAX_RETRIES + 1):
+                timeout = deadline.timeout(settings.LLM_REQUEST_TIMEOUT)
+                try:
+                    return endpoint.client.chat.completions.create(model=endpoint.model, timeout=timeout, **kwargs)
+                except Exception as e:
+                    last_error = e
+                    if not is_transient(e) or attempt == settings.LLM_MAX_RETRIES:
+                        break
+                    delay = backoff_delay(attempt)
+                    if delay >= deadline.remaining():
+                        raise DeadlineExceeded(str(e)) from e
+                    metrics.LLM_RETRIES.inc(model=endpoint.model)
+                    time.sleep(delay)
+            if i + 1 < len(self.endpoints):
+                metrics.LLM_FALLBACKS.inc(model=endpoint.model)
+                console.print(f"[yellow]{endpoint.provider}:{endpoint.model} failed ({last_error}), falling back.[/yellow]")
+        raise last_error
+
+    async def _complete_async(self, deadline: Deadline, **kwargs):
+        """Async _complete()."""
+        last_error = None
+        for i, endpoint in enumerate(self.endpoints):
+            for attempt in range(settings.LLM_MAX_RETRIES + 1):
+                timeout = deadline.timeout(settings.LLM_REQUEST_TIMEOUT)
+                try:
+                    return await endpoint.async_client.chat.completions.create(
+                        model=endpoint.model, timeout=timeout, **kwargs
+                    )
+                except Exception as e:
+                    last_error = e
+                    if not is_transient(e) or attempt == settings.LLM_MAX_RETRIES:
+                        break
+                    delay = backoff_delay(attempt)
+                    if delay >= deadline.remaining():
+                        raise DeadlineExceeded(str(e)) from e
+                    metrics.LLM_RETRIES.inc(model=endpoint.model)
+                    await asyncio.sleep(delay)
+            if i + 1 < len(self.endpoints):
+                metrics.LLM_FALLBACKS.inc(model=endpoint.model)
+                console.print(f"[yellow]{endpoint.provider}:{endpoint.model} failed ({last_error}), falling back.[/yellow]")
+        raise last_error
+
+    def _partial_answer(self, turn_start: int) -> str:
+        """Best answer available when the time budget runs out mid-turn."""
+        metrics.ERRORS.inc(component="deadline")
+        turn = self.conversation_history.since(turn_start)
+        findings = [m.content for m in turn if m.role == "tool" and m.content]
+        if findings:
+            answer = ("Sir, I ran out of time before finishing, but here is what I found:\n"
+                      + "\n\n".join(findings)[:800])
+        else:
+            answer = "Sir, that took longer than my time budget allows. Please try again."
+        self.conversation_history.append({"role": "assistant", "content": answer})
+        return answer
+
+    def _run_tool_calls(self, calls: List[ToolCall], skills: Dict = None, deadline: Optional[Deadline] = None) -> List[str]:
+        """Run one round's tool calls concurrently; results come back in call order.
+        
+        Each call gets TOOL_TIMEOUT seconds from when it starts running and the
+        whole round TOOL_ROUND_TIMEOUT, cut short by the request deadline; a
+        call that misses its deadline is reported to the model as an error.
+        """
+        round_deadline = self._round_deadline(deadline)
+        started: Dict[int, float] = {}
+        
+        def run(index: int, name: str, arguments: str) -> str:
+            started[index] = time.monotonic()
+            return self._run_tool_call(name, arguments, skills)
+        
+        futures = [
+            self._tool_executor.submit(run, index, name, arguments)
+            for index, (_, name, arguments) in enumerate(calls)
+        ]
+        results = []
+        for index, ((_, name, _), future) in enumerate(zip(calls, futures)):
+            try:
+                while True:
+                    timeout = self._tool_wait(started.get(index), round_deadline)
+                    # A call that finished while earlier ones were waited on still counts
+                    if timeout <= 0 and not future.done():
+                        raise concurrent.futures.TimeoutError()
+                    try:
+                        results.append(future.result(timeout=max(timeout, 0)))
+                        break
+                    except concurrent.futures.TimeoutError:
+                        # Raised by the tool itself rather than by the wait
+                        if future.done():
+                            raise
+            except concurrent.futures.TimeoutError:
+                future.cancel()
+                metrics.ERRORS.inc(component="tool_timeout")
+                results.append(f"Error: Tool {name} timed out.")
+            except Exception as e:
+                metrics.ERRORS.inc(component="tool")
+                results.append(f"Error: Tool {name} failed: {e}")
+        return results
+
+    async def _run_tool_calls_async(self, calls: List[ToolCall], skills: Dict = None, deadline: Optional[Deadline] = None) -> List[str]:
+        """Async _run_tool_calls(); blocking skills still run on worker threads."""
+        round_deadline = self._round_deadline(deadline)
+        started: Dict[int, float] = {}
+        
+        def call(index: int, name: str, arguments: str) -> str:
+            started[index] = time.monotonic()
+            return self._run_tool_call(name, arguments, skills)
+        
+        async def run(index: int, name: str, arguments: str) -> str:
+            task = asyncio.ensure_future(asyncio.to_thread(call, index, name, arguments))
+            try:
+                while True:
+                    timeout = self._tool_wait(started.get(index), round_deadline)
+                    if timeout <= 0 and not task.done():
+                        raise asyncio.TimeoutError()
+                    try:
+                        return await asyncio.wait_for(asyncio.shield(task), max(timeout, 0))
+                    except asyncio.TimeoutError:
+                        if task.done():
+                            raise
+            except asyncio.TimeoutError:
+                task.cancel()
+                metrics.ERRORS.inc(component="tool_timeout")
+                return f"Error: Tool {name} timed out."
+            except Exception as e:
+                metrics.ERRORS.inc(component="tool")
+                return f"Error: Tool {name} failed: {e}"
+        
+        return list(await asyncio.gather(*(run(index, name, arguments) for index, (_, name, arguments) in enumerate(calls))))
+
+    @staticmethod
+    def _round_deadline(deadline: Optional[Deadline]) -> float:
+        budget = settings.TOOL_ROUND_TIMEOUT
+        if deadline is not None:
+            budget = min(budget, deadline.remaining())
+        return time.monotonic() + budget
+
+    @staticmethod
+    def _tool_wait(started_at: Optional[float], round_deadline: float) -> float:
+        """Seconds left for one tool call, given when it started running.
+        
+        A call still queued behind other sessions' tools hasn't used any of
+        its TOOL_TIMEOUT yet, so it is waited on for a full TOOL_TIMEOUT from
+        now and checked again.
+        """
+        now = time.monotonic()
+        call_deadline = (now if started_at is None else started_at) + settings.TOOL_TIMEOUT
+        return min(call_deadline, round_deadline) - now
+
+    def _start_turn(self, user_input: str):
+        """Add the user's message; full results fetched in earlier turns shrink back to a stub."""
+        self.conversation_history.collapse_tool_results("get_tool_result", EXPIRED_FULL_RESULT)
         self.conversation_history.append({"role": "user", "content": user_input})
+
+    def _record_tool_results(self, calls: List[ToolCall], results: List[str]):
+        results = self.compactor.compact_round([name for _, name, _ in calls], results)
+        for (call_id, name, _), result in zip(calls, results):
+            self.conversation_history.append({
+                "role": "tool",
+                "tool_call_id": call_id,
+                "name": name,
+                "content": result
+            })
+
+    @staticmethod
+    def _merge_tool_call_delta(tool_calls: Dict[int, Dict], delta) -> None:
+        """Fold one streamed tool-call fragment into the calls collected so far."""
+        for tc in delta.tool_calls or []:
+            call = tool_calls.setdefault(tc.index, {
+                "id": "",
+                "type": "function",
+                "function": {"name": "", "arguments": ""}
+            })
+            if tc.id:
+                call["id"] = tc.id
+            if tc.function and tc.function.name:
+                call["function"]["name"] += tc.function.name
+            if tc.function and tc.function.arguments:
+                call["function"]["arguments"] += tc.function.arguments
+
+    def think(self, user_input: str, skills: Dict = None, timeout: Optional[float] = None) -> str:
+        """Process user input and generate a response, potentially using tools."""
+        self._start_turn(user_input)
+        
+        # Deterministic requests are answered locally, without an LLM round trip
+        routed = self._router.route(user_input, skills)
+        if routed is not None:
+            self.conversation_history.append({"role": "assistant", "content": routed})
+            return routed
         
         # Initial tools definition
-        tools = self._get_tools_definition()
+        tools = self._get_tools_definition(skills)
+        deadline = Deadline(timeout or settings.THINK_DEADLINE)
+        turn_start = self.conversation_history.position
+        self._start_prefetch(user_input, skills)
         
         for _ in range(5): # Allow up to 5 tool iterations
-            messages = [{"role": "system", "content": self.system_prompt}] + self.conversation_history[-15:]
+            if deadline.expired():
+                return self._partial_answer(turn_start)
+            messages = self._build_messages(tools)
+            
+            cached = self._cached_answer(messages, tools)
+            if cached is not None:
+                self.conversation_history.append({"role": "assistant", "content": cached})
+                return cached
             
             try:
-                response = self.client.chat.completions.create(
-                    model="gpt-3.5-turbo",
-                    messages=messages,
-                    tools=tools,
-                    tool_choice="auto",
-                    temperature=0.7
-                )
+                metrics.THINK_ITERATIONS.inc(mode="sync")
+                with metrics.LLM_LATENCY.time(mode="sync"):
+                    response = self._complete(
+                        deadline,
+                        messages=messages,
+                        tools=tools,
+                        tool_choice="auto",
+                        temperature=self.temperature
+                    )
+                
+                msg = response.choices[0].message
+                
+                if msg.tool_calls:
+                    self.conversation_history.append(msg)
+                    
+                    calls = [(tc.id, tc.function.name, tc.function.arguments) for tc in msg.tool_calls]
+                    self._record_tool_results(calls, self._run_tool_calls(calls, skills, deadline))
+                    continue # Call API again with tool results
+                
+                assistant_message = msg.content
+                self.conversation_history.append({"role": "assistant", "content": assistant_message})
+                self._cache_answer(messages, tools, assistant_message)
+                return assistant_message
+                
+            except DeadlineExceeded:
+                return self._partial_answer(turn_start)
+            except Exception as e:
+                metrics.ERRORS.inc(component="brain")
+                console.print(f"[red]Brain error: {e}[/red]")
+                return "Sir, I'm experiencing cognitive interference. Please check my tool connectivity."
+        
+        return "I've reached my thinking limit for this request, Sir."
+
+    async def think_async(self, user_input: str, skills: Dict = None, timeout: Optional[float] = None) -> str:
+        """Async think() on the pooled AsyncOpenAI client.
+        
+        The LLM round-trips are awaited on the event loop; the intent router
+        and the blocking skill calls are pushed to a worker thread.
+        """
+        self._start_turn(user_input)
+        
+        routed = await asyncio.to_thread(self._router.route, user_input, skills)
+        if routed is not None:
+            self.conversation_history.append({"role": "assistant", "content": routed})
+            return routed
+        
+        tools = self._get_tools_definition(skills)
+        deadline = Deadline(timeout or settings.THINK_DEADLINE)
+        turn_start = self.conversation_history.position
+        self._start_prefetch(user_input, skills)
+        
+        for _ in range(5): # Allow up to 5 tool iterations
+            if deadline.expired():
+                return self._partial_answer(turn_start)
+            messages = self._build_messages(tools)
+            
+            cached = self._cached_answer(messages, tools)
+            if cached is not None:
+                self.conversation_history.append({"role": "assistant", "content": cached})
+                return cached
+            
+            try:
+                metrics.THINK_ITERATIONS.inc(mode="async")
+                with metrics.LLM_LATENCY.time(mode="async"):
+                    response = await self._complete_async(
+                        deadline,
+                        messages=messages,
+                        tools=tools,
+                        tool_choice="auto",
+                        temperature=self.temperature
+                    )
                 
                 msg = response.choices[0].message
                 
                 if msg.tool_calls:
                     self.conversation_history.append(msg)
                     
-                    for tool_call in msg.tool_calls:
-                        function_name = tool_call.function.name
-                        args = json.loads(tool_call.function.arguments)
-                        
-                        console.print(f"[dim]Executing tool: {function_name}({args})[/dim]")
-                        
-                        if skills and function_name in skills:
-                            result = skills[function_name].execute(**args)
-                        else:
-                            result = f"Error: Tool {function_name} not found."
-                            
-                        self.conversation_history.append({
-                            "role": "tool",
-                            "tool_call_id": tool_call.id,
-                            "name": function_name,
-                            "content": str(result)
-                        })
+                    calls = [(tc.id, tc.function.name, tc.function.arguments) for tc in msg.tool_calls]
+                    self._record_tool_results(calls, await self._run_tool_calls_async(calls, skills, deadline))
                     continue # Call API again with tool results
                 
                 assistant_message = msg.content
                 self.conversation_history.append({"role": "assistant", "content": assistant_message})
+                self._cache_answer(messages, tools, assistant_message)
                 return assistant_message
                 
+            except DeadlineExceeded:
+                return self._partial_answer(turn_start)
             except Exception as e:
+                metrics.ERRORS.inc(component="brain")
                 console.print(f"[red]Brain error: {e}[/red]")
                 return "Sir, I'm experiencing cognitive interference. Please check my tool connectivity."
         
         return "I've reached my thinking limit for this request, Sir."
+
+    def think_stream(self, user_input: str, skills: Dict = None, timeout: Optional[float] = None) -> Iterator[str]:
+        """Like think(), but yields the reply as text deltas while the model produces it.
+        
+        Tool calls are accumulated from the stream and executed between rounds,
+        so deltas keep flowing across the whole tool loop.
+        """
+        self._start_turn(user_input)
+        
+        routed = self._router.route(user_input, skills)
+        if routed is not None:
+            self.conversation_history.append({"role": "assistant", "content": routed})
+            yield routed
+            return
+        
+        tools = self._get_tools_definition(skills)
+        deadline = Deadline(timeout or settings.THINK_DEADLINE)
+        turn_start = self.conversation_history.position
+        self._start_prefetch(user_input, skills)
+        
+        for _ in range(5): # Allow up to 5 tool iterations
+            if deadline.expired():
+                yield self._partial_answer(turn_start)
+                return
+            messages = self._build_messages(tools)
+            
+            cached = self._cached_answer(messages, tools)
+            if cached is not None:
+                self.conversation_history.append({"role": "assistant", "content": cached})
+                yield cached
+                return
+            
+            content_parts = []
+            try:
+                metrics.THINK_ITERATIONS.inc(mode="stream")
+                start = time.perf_counter()
+                first_token = True
+                stream = self._complete(
+                    deadline,
+                    messages=messages,
+                    tools=tools,
+                    tool_choice="auto",
+                    temperature=self.temperature,
+                    stream=True
+                )
+                
+                tool_calls: Dict[int, Dict] = {}
+                for chunk in stream:
+                    if deadline.expired():
+                        raise DeadlineExceeded("Deadline exceeded mid-stream")
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta
+                    if first_token:
+                        metrics.LLM_FIRST_TOKEN.observe(time.perf_counter() - start, mode="stream")
+                        first_token = False
+                    
+                    if delta.content:
+                        content_parts.append(delta.content)
+                        yield delta.content
+                    
+                    # Tool calls arrive in fragments keyed by index
+                    self._merge_tool_call_delta(tool_calls, delta)
+                
+                metrics.LLM_LATENCY.observe(time.perf_counter() - start, mode="stream")
+                content = "".join(content_parts)
+                
+                if tool_calls:
+                    calls = [tool_calls[i] for i in sorted(tool_calls)]
+                    self.conversation_history.append({
+                        "role": "assistant",
+                        "content": content or None,
+                        "tool_calls": calls
+                    })
+                    
+                    pending = [(c["id"], c["function"]["name"], c["function"]["arguments"]) for c in calls]
+                    self._record_tool_results(pending, self._run_tool_calls(pending, skills, deadline))
+                    continue # Call API again with tool results
+                
+                self.conversation_history.append({"role": "assistant", "content": content})
+                self._cache_answer(messages, tools, content)
+                return
+                
+            except DeadlineExceeded:
+                # Whatever was already streamed is the best partial answer
+                if content_parts:
+                    self.conversation_history.append({"role": "assistant", "content": "".join(content_parts)})
+                else:
+                    yield self._partial_answer(turn_start)
+                return
+            except Exception as e:
+                metrics.ERRORS.inc(component="brain")
+                console.print(f"[red]Brain error: {e}[/red]")
+                yield "Sir, I'm experiencing cognitive interference. Please check my tool connectivity."
+                return
+        
+        yield "I've reached my thinking limit for this request, Sir."
+
+    async def think_stream_async(self, user_input: str, skills: Dict = None, timeout: Optional[float] = None) -> AsyncIterator[str]:
+        """Async think_stream() on the pooled AsyncOpenAI client."""
+        self._start_turn(user_input)
+        
+        # Local skills can block, so routing stays off the event loop
+        routed = await asyncio.to_thread(self._router.route, user_input, skills)
+        if routed is not None:
+            self.conversation_history.append({"role": "assistant", "content": routed})
+            yield routed
+            return
+        
+        tools = self._get_tools_definition(skills)
+        deadline = Deadline(timeout or settings.THINK_DEADLINE)
+        turn_start = self.conversation_history.position
+        self._start_prefetch(user_input, skills)
+        
+        for _ in range(5): # Allow up to 5 tool iterations
+            if deadline.expired():
+                yield self._partial_answer(turn_start)
+                return
+            messages = self._build_messages(tools)
+            
+            cached = self._cached_answer(messages, tools)
+            if cached is not None:
+                self.conversation_history.append({"role": "assistant", "content": cached})
+                yield cached
+                return
+            
+            content_parts = []
+            try:
+                metrics.THINK_ITERATIONS.inc(mode="stream_async")
+                start = time.perf_counter()
+                first_token = True
+                stream = await self._complete_async(
+                    deadline,
+                    messages=messages,
+                    tools=tools,
+                    tool_choice="auto",
+                    temperature=self.temperature,
+                    stream=True
+                )
+                
+                tool_calls: Dict[int, Dict] = {}
+                async for chunk in stream:
+                    if deadline.expired():
+                        raise DeadlineExceeded("Deadline exceeded mid-stream")
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta
+                    if first_token:
+                        metrics.LLM_FIRST_TOKEN.observe(time.perf_counter() - start, mode="stream_async")
+                        first_token = False
+                    
+                    if delta.content:
+                        content_parts.append(delta.content)
+                        yield delta.content
+                    
+                    self._merge_tool_call_delta(tool_calls, delta)
+                
+                metrics.LLM_LATENCY.observe(time.perf_counter() - start, mode="stream_async")
+                content = "".join(content_parts)
+                
+                if tool_calls:
+                    calls = [tool_calls[i] for i in sorted(tool_calls)]
+                    self.conversation_history.append({
+                        "role": "assistant",
+                        "content": content or None,
+                        "tool_calls": calls
+                    })
+                    
+                    pending = [(c["id"], c["function"]["name"], c["function"]["arguments"]) for c in calls]
+                    self._record_tool_results(pending, await self._run_tool_calls_async(pending, skills, deadline))
+                    continue # Call API again with tool results
+                
+                self.conversation_history.append({"role": "assistant", "content": content})
+                self._cache_answer(messages, tools, content)
+                return
+                
+            except DeadlineExceeded:
+                # Whatever was already streamed is the best partial answer
+                if content_parts:
+                    self.conversation_history.append({"role": "assistant", "content": "".join(content_parts)})
+                else:
+                    yield self._partial_answer(turn_start)
+                return
+            except Exception as e:
+                metrics.ERRORS.inc(component="brain")
+                console.print(f"[red]Brain error: {e}[/red]")
+                yield "Sir, I'm experiencing cognitive interference. Please check my tool connectivity."
+                return
+        
+        yield "I've reached my thinking limit for this request, Sir."
     
     def clear_history(self):
         """Clear conversation history."""
-        self.conversation_history = []
+        self.conversation_history.clear()
         console.print("[dim]Memory cleared.[/dim]")
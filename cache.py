@@ -0,0 +1,146 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from rich.console import Console
+import metrics
+
+console = Console()
+
+class TTLCache:
+    """In-memory LRU cache with per-entry TTL and an optional SQLite tier.
+
+    Values must be JSON-serializable so they can be written to disk. The
+    memory tier holds `max_entries`; the disk tier (if `disk_path` is set)
+    holds up to `disk_max_entries` and survives restarts. Expired entries
+    are kept for another `max_stale` seconds so callers can serve them
+    while a refresh happens.
+    """
+
+    def __init__(self, name: str, max_entries: int = 512, ttl: float = 3600,
+                 disk_path: Optional[str] = None, disk_max_entries: int = 10000, max_stale: float = 0):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.disk_max_entries = disk_max_entries
+        self._entries: "OrderedDict[str, Tuple[Any, float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.disk_hits = 0
+        self._disk_writes = 0
+        self._db = self._open_disk(disk_path) if disk_path else None
+
+    def _open_disk(self, disk_path: str) -> Optional[sqlite3.Connection]:
+        try:
+            Path(disk_path).parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(disk_path, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("""CREATE TABLE IF NOT EXISTS cache (
+                key TEXT PRIMARY KEY, value TEXT NOT NULL, stored_at REAL NOT NULL, ttl REAL NOT NULL)""")
+            db.execute("CREATE INDEX IF NOT EXISTS cache_stored_at ON cache (stored_at)")
+            return db
+        except Exception as e:
+            console.print(f"[yellow]Could not open {self.name} cache at {disk_path}: {e}[/yellow]")
+            return None
+
+    def _load_disk(self, key: str) -> Optional[Tuple[Any, float, float]]:
+        if not self._db:
+            return None
+        row = self._db.execute("SELECT value, stored_at, ttl FROM cache WHERE key = ?", (key,)).fetchone()
+        if not row:
+            return None
+        return json.loads(row[0]), row[1], row[2]
+
+    def _record(self, result: str):
+        metrics.CACHE_REQUESTS.inc(cache=self.name, result=result)
+
+    def get_with_age(self, key: str) -> Optional[Tuple[Any, float, bool]]:
+        """Return (value, age in seconds, is_fresh), or None on a miss.
+
+        Expired entries are returned with is_fresh=False while they are
+        within `max_stale` of their TTL.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            from_disk = False
+            if entry is None:
+                entry = self._load_disk(key)
+                from_disk = entry is not None
+            if entry is not None:
+                value, stored_at, ttl = entry
+                age = now - stored_at
+                if age <= ttl + self.max_stale:
+                    self._remember(key, entry)
+                    fresh = age <= ttl
+                    if fresh:
+                        self.hits += 1
+                        if from_disk:
+                            self.disk_hits += 1
+                        self._record("disk_hit" if from_disk else "hit")
+                    else:
+                        self._record("stale")
+                    return value, age, fresh
+                self._entries.pop(key, None)
+            self.misses += 1
+            self._record("miss")
+            return None
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return a fresh value, or None."""
+        found = self.get_with_age(key)
+        if found and found[2]:
+            return found[0]
+        return None
+
+    def _remember(self, key: str, entry: Tuple[Any, float, float]):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        entry = (value, time.time(), self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._remember(key, entry)
+            if self._db:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO cache (key, value, stored_at, ttl) VALUES (?, ?, ?, ?)",
+                        (key, json.dumps(value, ensure_ascii=False), entry[1], entry[2])
+                    )
+                    self._disk_writes += 1
+                    if self._disk_writes % 100 == 0:
+                        self._prune_disk()
+                except Exception as e:
+                    console.print(f"[yellow]Could not write {self.name} cache: {e}[/yellow]")
+
+    def _prune_disk(self):
+        """Keep the disk tier bounded by dropping the oldest entries."""
+        count = self._db.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+        if count > self.disk_max_entries:
+            self._db.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY stored_at LIMIT ?)",
+                (count - self.disk_max_entries,)
+            )
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db:
+                self._db.execute("DELETE FROM cache")
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
@@ -0,0 +1,131 @@
+import hashlib
+import re
+from collections import OrderedDict
+from typing import Dict, List, Optional, Set
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+from context import count_tokens
+import metrics
+
+# Query parameters that only track the click and never change the page
+TRACKING_PARAMS = re.compile(
+    r"^(utm_\w+|gclid|gclsrc|dclid|fbclid|msclkid|yclid|mc_cid|mc_eid|_hsenc|_hsmi|igshid|ref_src|spm)$", re.I
+)
+URL_PATTERN = re.compile(r"https?://[^\s)>\]]+")
+
+# Tools whose results are returned in full and never compacted
+UNCOMPACTED_TOOLS = {"get_tool_result"}
+# What a get_tool_result answer is replaced with once its turn is over
+EXPIRED_FULL_RESULT = ("[Full result shown for an earlier question. "
+                       "Call get_tool_result again if it is needed.]")
+
+def strip_tracking(url: str) -> str:
+    """Drop tracking query parameters and fragments from a URL."""
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not TRACKING_PARAMS.match(k)]
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ""))
+
+def _blocks(text: str) -> List[str]:
+    """Split a result into its entries (blank-line or --- separated)."""
+    return [b.strip() for b in re.split(r"\n\s*\n", text) if b.strip() and b.strip() != "---"]
+
+def _shorten_lines(block: str, max_chars: int) -> str:
+    """Cut long snippet lines so one verbose entry can't crowd out the rest."""
+    return "\n".join(line if len(line) <= max_chars else line[:max_chars].rstrip() + "..."
+                     for line in block.splitlines())
+
+def _dedupe_key(block: str) -> str:
+    url = URL_PATTERN.search(block)
+    if url:
+        return url.group(0).rstrip("/").lower()
+    return re.sub(r"\W+", " ", block).strip().lower()
+
+def parse_budgets(spec: str) -> Dict[str, int]:
+    """Parse "web_search=300,google_search=300" into per-tool token budgets."""
+    budgets = {}
+    for entry in filter(None, (e.strip() for e in spec.split(","))):
+        name, _, tokens = entry.partition("=")
+        if tokens.strip().isdigit():
+            budgets[name.strip()] = int(tokens)
+    return budgets
+
+class ResultCompactor:
+    """Shrinks tool results before they enter the conversation.
+
+    Entries are deduplicated (within a result and across one round of
+    tool calls), tracking parameters are stripped from URLs, long snippet
+    lines are shortened and the result is cut to the tool's token budget.
+    When anything is cut, the full result is kept here and the prompt gets
+    a reference the model can pass to the get_tool_result tool. The full
+    text is only sent for the turn that asked for it.
+    """
+
+    def __init__(self, max_tokens: int = 400, budgets: Optional[Dict[str, int]] = None,
+                 max_results: int = 32, max_line_chars: int = 240, model: str = "gpt-3.5-turbo"):
+        self.max_tokens = max_tokens
+        self.max_line_chars = max_line_chars
+        self.budgets = budgets or {}
+        self.max_results = max_results
+        self.model = model
+        self._full: "OrderedDict[str, str]" = OrderedDict()
+
+    def budget(self, tool_name: str) -> int:
+        return self.budgets.get(tool_name, self.max_tokens)
+
+    def compact_round(self, names: List[str], results: List[str]) -> List[str]:
+        """Compact one round's results, in call order."""
+        seen: Set[str] = set()
+        return [self.compact(name, result, seen) for name, result in zip(names, results)]
+
+    def compact(self, tool_name: str, text: str, seen: Optional[Set[str]] = None) -> str:
+        if tool_name in UNCOMPACTED_TOOLS or not text:
+            return text
+        seen = set() if seen is None else seen
+        text = URL_PATTERN.sub(lambda m: strip_tracking(m.group(0)), text)
+
+        budget = self.budget(tool_name)
+        kept, used, cut = [], 0, False
+        for block in _blocks(text):
+            key = _dedupe_key(block)
+            if key in seen:
+                continue
+            seen.add(key)
+            if cut:
+                continue
+            block = _shorten_lines(block, self.max_line_chars)
+            tokens = count_tokens(block, self.model)
+            if used + tokens > budget:
+                cut = True
+                # Keep the head of an entry if there is room for something useful
+                room = (budget - used) * 4
+                if room >= 80:
+                    kept.append(block[:room].rstrip() + "...")
+                continue
+            kept.append(block)
+            used += tokens
+
+        compacted = "\n\n".join(kept)
+        if cut:
+            ref = self._store(text)
+            compacted += f"\n\n[Truncated. Full result: get_tool_result(ref=\"{ref}\")]"
+        saved = count_tokens(text, self.model) - count_tokens(compacted, self.model)
+        if saved > 0:
+            metrics.TOOL_TOKENS_SAVED.inc(saved, tool=tool_name)
+        return compacted
+
+    def _store(self, text: str) -> str:
+        ref = hashlib.sha1(text.encode("utf-8")).hexdigest()[:10]
+        self._full[ref] = text
+        self._full.move_to_end(ref)
+        while len(self._full) > self.max_results:
+            self._full.popitem(last=False)
+        return ref
+
+    def get(self, ref: str) -> str:
+        """Full text of a compacted result."""
+        text = self._full.get(ref)
+        if text is None:
+            return f"Error: No stored result with ref {ref}."
+        return text
@@ -11,6 +11,78 @@ class Settings(BaseSettings):
     VOICE_ID: Optional[str] = os.getenv("VOICE_ID")
     WAKE_WORD: str = os.getenv("WAKE_WORD", "jarvis")
     MIC_INDEX: Optional[int] = os.getenv("MIC_INDEX")
+    LLM_MODEL: str = os.getenv("LLM_MODEL", "gpt-3.5-turbo")
+    LLM_FALLBACK_MODELS: str = os.getenv("LLM_FALLBACK_MODELS", "")
+    OPENROUTER_API_KEY: Optional[str] = os.getenv("OPENROUTER_API_KEY")
+    LLM_REQUEST_TIMEOUT: float = float(os.getenv("LLM_REQUEST_TIMEOUT", 20.0))
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", 2))
+    THINK_DEADLINE: float = float(os.getenv("THINK_DEADLINE", 45.0))
+    LLM_CACHE_ENABLED: bool = os.getenv("LLM_CACHE_ENABLED", "false").lower() in ("1", "true", "yes")
+    LLM_CACHE_TTL: float = float(os.getenv("LLM_CACHE_TTL", 3600))
+    LLM_CACHE_MAX_ENTRIES: int = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 512))
+    LLM_CACHE_DISK_PATH: str = os.getenv("LLM_CACHE_DISK_PATH", "")
+    LLM_MAX_CONNECTIONS: int = int(os.getenv("LLM_MAX_CONNECTIONS", 100))
+    LLM_MAX_KEEPALIVE: int = int(os.getenv("LLM_MAX_KEEPALIVE", 20))
+    LLM_KEEPALIVE_EXPIRY: float = float(os.getenv("LLM_KEEPALIVE_EXPIRY", 30.0))
+    CONVERSATION_MAX_MESSAGES: int = int(os.getenv("CONVERSATION_MAX_MESSAGES", 200))
+    CONVERSATION_MAX_BYTES: int = int(os.getenv("CONVERSATION_MAX_BYTES", 262144))
+    CONTEXT_MAX_TOKENS: int = int(os.getenv("CONTEXT_MAX_TOKENS", 3000))
+    TOOL_TIMEOUT: float = float(os.getenv("TOOL_TIMEOUT", 15.0))
+    TOOL_ROUND_TIMEOUT: float = float(os.getenv("TOOL_ROUND_TIMEOUT", 20.0))
+    TOOL_RESULT_MAX_TOKENS: int = int(os.getenv("TOOL_RESULT_MAX_TOKENS", 400))
+    TOOL_RESULT_BUDGETS: str = os.getenv("TOOL_RESULT_BUDGETS", "search=400,web_search=300,google_search=300")
+    SPECULATIVE_SEARCH: bool = os.getenv("SPECULATIVE_SEARCH", "false").lower() in ("1", "true", "yes")
+    PREFETCH_MATCH_THRESHOLD: float = float(os.getenv("PREFETCH_MATCH_THRESHOLD", 0.5))
+    SEARCH_PROVIDERS: str = os.getenv("SEARCH_PROVIDERS", "duckduckgo,google")
+    SEARCH_DEADLINE: float = float(os.getenv("SEARCH_DEADLINE", 4.0))
+    # The federated "search" tool covers these, so the model isn't offered both
+    SKILLS_DISABLED: str = os.getenv("SKILLS_DISABLED", "web_search,google_search")
+    SEARCH_CACHE_ENABLED: bool = os.getenv("SEARCH_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+    SEARCH_CACHE_TTL: float = float(os.getenv("SEARCH_CACHE_TTL", 900))
+    SEARCH_CACHE_TTLS: str = os.getenv("SEARCH_CACHE_TTLS", "duckduckgo=600,google=1800")
+    SEARCH_CACHE_MAX_STALE: float = float(os.getenv("SEARCH_CACHE_MAX_STALE", 3600))
+    SEARCH_CACHE_MAX_ENTRIES: int = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", 256))
+    SEARCH_CACHE_DISK_PATH: str = os.getenv("SEARCH_CACHE_DISK_PATH", "search_cache.db")
+    SEARCH_CACHE_DISK_MAX_ENTRIES: int = int(os.getenv("SEARCH_CACHE_DISK_MAX_ENTRIES", 5000))
+    TOOL_MAX_WORKERS: int = int(os.getenv("TOOL_MAX_WORKERS", 8))
+    CHAT_MAX_CONCURRENCY: int = int(os.getenv("CHAT_MAX_CONCURRENCY", 16))
+    CHAT_MAX_QUEUE: int = int(os.getenv("CHAT_MAX_QUEUE", 64))
+    CHAT_QUEUE_TIMEOUT: float = float(os.getenv("CHAT_QUEUE_TIMEOUT", 10.0))
+    MEMORY_BACKEND: str = os.getenv("MEMORY_BACKEND", "sqlite")
+    MEMORY_WRITE_DELAY: float = float(os.getenv("MEMORY_WRITE_DELAY", 0.5))
+    MEMORY_INDEX_DIM: int = int(os.getenv("MEMORY_INDEX_DIM", 512))
+    MEMORY_INDEX_HISTORY: int = int(os.getenv("MEMORY_INDEX_HISTORY", 500))
+    MEMORY_TOP_K: int = int(os.getenv("MEMORY_TOP_K", 5))
+    HISTORY_LOG: str = os.getenv("HISTORY_LOG", "conversation_history.jsonl")
+    # Pre-JSONL history, imported into HISTORY_LOG by whichever process opens it first
+    HISTORY_LEGACY_FILE: str = os.getenv("HISTORY_LEGACY_FILE", "conversation_history.json")
+    FACT_EXTRACTION_ENABLED: bool = os.getenv("FACT_EXTRACTION_ENABLED", "true").lower() in ("1", "true", "yes")
+    FACT_EXTRACTION_MODE: str = os.getenv("FACT_EXTRACTION_MODE", "rules")
+    FACT_EXTRACTION_MODEL: Optional[str] = os.getenv("FACT_EXTRACTION_MODEL")
+    FACT_EXTRACTION_BATCH: int = int(os.getenv("FACT_EXTRACTION_BATCH", 20))
+    FACT_EXTRACTION_MAX_WAIT: float = float(os.getenv("FACT_EXTRACTION_MAX_WAIT", 300))
+    FACT_EXTRACTION_INTERVAL: float = float(os.getenv("FACT_EXTRACTION_INTERVAL", 30))
+    FACT_EXTRACTION_STATE: str = os.getenv("FACT_EXTRACTION_STATE", "fact_extraction_state.json")
+    STATS_SAMPLE_INTERVAL: float = float(os.getenv("STATS_SAMPLE_INTERVAL", 1.0))
+    STATS_MAX_SAMPLES: int = int(os.getenv("STATS_MAX_SAMPLES", 300))
+    SESSION_DIR: str = os.getenv("SESSION_DIR", "sessions")
+    SESSION_MAX_ACTIVE: int = int(os.getenv("SESSION_MAX_ACTIVE", 100))
+    SESSION_IDLE_TIMEOUT: float = float(os.getenv("SESSION_IDLE_TIMEOUT", 1800))
+    # Point Brain and the search skills at stub_server.py for offline runs
+    LLM_BASE_URL: Optional[str] = os.getenv("LLM_BASE_URL")
+    SEARCH_BASE_URL: Optional[str] = os.getenv("SEARCH_BASE_URL")
+    STUB_MODE: str = os.getenv("STUB_MODE", "replay")
+    STUB_PORT: int = int(os.getenv("STUB_PORT", 8100))
+    STUB_TRANSCRIPT: str = os.getenv("STUB_TRANSCRIPT", "stub_transcripts.jsonl")
+    STUB_UPSTREAM_URL: str = os.getenv("STUB_UPSTREAM_URL", "https://api.openai.com/v1")
+    STUB_UPSTREAM_TIMEOUT: float = float(os.getenv("STUB_UPSTREAM_TIMEOUT", 60.0))
+    STUB_LATENCY: float = float(os.getenv("STUB_LATENCY", 0.0))
+    STUB_LATENCY_JITTER: float = float(os.getenv("STUB_LATENCY_JITTER", 0.0))
+    STUB_SEARCH_LATENCY_SCALE: float = float(os.getenv("STUB_SEARCH_LATENCY_SCALE", 1.0))
+    STUB_TOKENS_PER_SEC: float = float(os.getenv("STUB_TOKENS_PER_SEC", 0.0))
+    STUB_ERROR_RATE: float = float(os.getenv("STUB_ERROR_RATE", 0.0))
+    STUB_ERROR_STATUS: int = int(os.getenv("STUB_ERROR_STATUS", 503))
+    STUB_SEED: int = int(os.getenv("STUB_SEED", 0))
     
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
@@ -0,0 +1,99 @@
+import json
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+
+# tiktoken gives exact counts; without it we fall back to a ~4 chars/token estimate
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    tiktoken = None
+    TIKTOKEN_AVAILABLE = False
+
+# Fixed cost the chat format adds around every message
+MESSAGE_OVERHEAD = 4
+
+@lru_cache(maxsize=8)
+def _encoding(model: str):
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+@lru_cache(maxsize=1024)
+def count_tokens(text: str, model: str = "gpt-3.5-turbo") -> int:
+    """Number of tokens `text` costs in a prompt for `model`."""
+    if not text:
+        return 0
+    if TIKTOKEN_AVAILABLE:
+        return len(_encoding(model).encode(text))
+    return (len(text) + 3) // 4
+
+def _field(message: Any, key: str) -> Any:
+    """Read a field from a plain dict or an SDK message object."""
+    if isinstance(message, dict):
+        return message.get(key)
+    return getattr(message, key, None)
+
+def _tool_call_text(tool_call: Any) -> str:
+    # conversation.Message keeps tool calls as (id, name, arguments)
+    if isinstance(tool_call, tuple):
+        return (tool_call[1] or "") + (tool_call[2] or "")
+    function = _field(tool_call, "function")
+    return (_field(function, "name") or "") + (_field(function, "arguments") or "")
+
+def message_tokens(message: Any, model: str = "gpt-3.5-turbo") -> int:
+    """Token cost of one chat message, including any tool calls it carries."""
+    tokens = MESSAGE_OVERHEAD + count_tokens(_field(message, "content") or "", model)
+    tokens += count_tokens(_field(message, "name") or "", model)
+    for tool_call in _field(message, "tool_calls") or []:
+        tokens += count_tokens(_tool_call_text(tool_call), model)
+    return tokens
+
+class ContextBuilder:
+    """Packs the newest conversation turns into a fixed token budget.
+
+    An assistant message that issued tool_calls and the tool results that
+    answer it are kept or dropped together, so the model never sees a
+    tool result without the call that produced it.
+    """
+
+    def __init__(self, max_tokens: int = 3000, model: str = "gpt-3.5-turbo"):
+        self.max_tokens = max_tokens
+        self.model = model
+
+    @staticmethod
+    def _group(history: List[Any]) -> List[List[Any]]:
+        """Split history into units that must stay together."""
+        units: List[List[Any]] = []
+        for message in history:
+            if _field(message, "role") == "tool" and units and _field(units[-1][0], "tool_calls"):
+                units[-1].append(message)
+            else:
+                units.append([message])
+        return units
+
+    def tools_tokens(self, tools: List[Dict]) -> int:
+        return count_tokens(json.dumps(tools), self.model) if tools else 0
+
+    def build(self, system_prompt: str, history: List[Any], tools: List[Dict] = None) -> Tuple[List[Any], int]:
+        """Return the prompt messages and their total token count.
+
+        The newest unit is always included, even if it alone exceeds the budget.
+        """
+        system = {"role": "system", "content": system_prompt}
+        used = message_tokens(system, self.model) + self.tools_tokens(tools)
+
+        selected: List[List[Any]] = []
+        for unit in reversed(self._group(history)):
+            # Orphaned tool results (their call was trimmed away) are never sent
+            if _field(unit[0], "role") == "tool":
+                continue
+            cost = sum(message_tokens(m, self.model) for m in unit)
+            if selected and used + cost > self.max_tokens:
+                break
+            selected.append(unit)
+            used += cost
+
+        messages = [system] + [m for unit in reversed(selected) for m in unit]
+        return messages, used
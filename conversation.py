@@ -0,0 +1,161 @@
+import sys
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Role strings are shared by every message instead of stored per message
+ROLES = {role: sys.intern(role) for role in ("system", "user", "assistant", "tool")}
+
+# Sender names used when old turns are written to the history store
+SENDERS = {"user": "User", "assistant": "Jarvis"}
+
+def _get(message: Any, key: str) -> Any:
+    if isinstance(message, dict):
+        return message.get(key)
+    return getattr(message, key, None)
+
+class Message:
+    """One chat message, without the per-instance dict of a plain object.
+
+    Tool calls are kept as (id, name, arguments) tuples and only expanded
+    into the API shape by to_dict().
+    """
+    __slots__ = ("role", "content", "name", "tool_call_id", "tool_calls", "size")
+
+    def __init__(self, role: str, content: Optional[str] = None, name: Optional[str] = None,
+                 tool_call_id: Optional[str] = None, tool_calls: Tuple[Tuple[str, str, str], ...] = ()):
+        self.role = ROLES.get(role) or sys.intern(role)
+        self.content = content
+        self.name = name
+        self.tool_call_id = tool_call_id
+        self.tool_calls = tool_calls
+        self.size = self._measure()
+
+    @classmethod
+    def from_any(cls, message: Any) -> "Message":
+        """Build from a plain dict or an SDK message object."""
+        if isinstance(message, Message):
+            return message
+        tool_calls = tuple(
+            (_get(tc, "id"), _get(_get(tc, "function"), "name"), _get(_get(tc, "function"), "arguments"))
+            for tc in _get(message, "tool_calls") or []
+        )
+        return cls(_get(message, "role"), _get(message, "content"), _get(message, "name"),
+                   _get(message, "tool_call_id"), tool_calls)
+
+    def _measure(self) -> int:
+        """Approximate bytes held by this message (the interned role is shared)."""
+        size = sys.getsizeof(self)
+        for value in (self.content, self.name, self.tool_call_id):
+            if value is not None:
+                size += sys.getsizeof(value)
+        for call in self.tool_calls:
+            size += sys.getsizeof(call) + sum(sys.getsizeof(part) for part in call if part)
+        return size
+
+    def to_dict(self) -> Dict:
+        """The message in the shape the chat completions API expects."""
+        message: Dict[str, Any] = {"role": self.role, "content": self.content}
+        if self.name is not None:
+            message["name"] = self.name
+        if self.tool_call_id is not None:
+            message["tool_call_id"] = self.tool_call_id
+        if self.tool_calls:
+            message["tool_calls"] = [
+                {"id": call_id, "type": "function", "function": {"name": name, "arguments": arguments}}
+                for call_id, name, arguments in self.tool_calls
+            ]
+        return message
+
+class Conversation:
+    """Bounded ring buffer of Messages for one Brain.
+
+    Holds at most `max_messages` messages and roughly `max_bytes` of them.
+    The oldest messages are dropped first; an assistant message that issued
+    tool calls is dropped together with its tool results. Dropped user and
+    assistant text is handed to `spill(sender, text)`, e.g.
+    HistoryStore.append, so it is not lost.
+    """
+
+    def __init__(self, max_messages: int = 200, max_bytes: int = 262144,
+                 spill: Optional[Callable[[str, str], Any]] = None):
+        self.max_messages = max_messages
+        self.max_bytes = max_bytes
+        self.spill = spill
+        self._messages: "deque[Message]" = deque()
+        self.bytes = 0
+        self.spilled = 0
+        # Messages ever appended; lets callers refer to "everything since X"
+        # even after older messages have been dropped
+        self.position = 0
+
+    def append(self, message: Any):
+        message = Message.from_any(message)
+        self._messages.append(message)
+        self.bytes += message.size
+        self.position += 1
+        self._enforce_limits()
+
+    def extend(self, messages: Iterable[Any]):
+        for message in messages:
+            self.append(message)
+
+    def _enforce_limits(self):
+        # The newest message always stays, however large it is
+        while len(self._messages) > 1 and (len(self._messages) > self.max_messages or self.bytes > self.max_bytes):
+            self._drop_oldest()
+
+    def _drop_oldest(self):
+        message = self._messages.popleft()
+        self.bytes -= message.size
+        if message.tool_calls:
+            while len(self._messages) > 1 and self._messages[0].role == "tool":
+                self.bytes -= self._messages.popleft().size
+        elif message.role in SENDERS and message.content:
+            self.spilled += 1
+            if self.spill is not None:
+                self.spill(SENDERS[message.role], message.content)
+
+    def collapse_tool_results(self, name: str, content: str) -> int:
+        """Replace the content of held results of tool `name`, e.g. once they are stale."""
+        collapsed = 0
+        for message in self._messages:
+            if message.role == "tool" and message.name == name and message.content != content:
+                self.bytes -= message.size
+                message.content = content
+                message.size = message._measure()
+                self.bytes += message.size
+                collapsed += 1
+        return collapsed
+
+    def since(self, position: int) -> List[Message]:
+        """Messages appended after `position` that are still held."""
+        count = min(self.position - position, len(self._messages))
+        return list(self._messages)[len(self._messages) - count:] if count > 0 else []
+
+    def to_dicts(self) -> List[Dict]:
+        return [message.to_dict() for message in self._messages]
+
+    def clear(self):
+        self._messages.clear()
+        self.bytes = 0
+
+    def stats(self) -> Dict:
+        return {
+            "messages": len(self._messages),
+            "bytes": self.bytes,
+            "spilled": self.spilled,
+            "max_messages": self.max_messages,
+            "max_bytes": self.max_bytes
+        }
+
+    def __iter__(self) -> Iterator[Message]:
+        return iter(self._messages)
+
+    def __reversed__(self) -> Iterator[Message]:
+        return reversed(self._messages)
+
+    def __len__(self) -> int:
+        return len(self._messages)
+
+    def __getitem__(self, index: int) -> Message:
+        return self._messages[index]
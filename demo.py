@@ -69,9 +69,11 @@ def simulate_conversation():
     print()
     
     # Clean up
+    mem.close()
     import os
-    if os.path.exists("demo_memory.json"):
-        os.remove("demo_memory.json")
+    for path in ("demo_memory.json", "demo_memory.db", "demo_memory.db-wal", "demo_memory.db-shm"):
+        if os.path.exists(path):
+            os.remove(path)
     
     print("=" * 60)
     print("DEMO COMPLETE!")
@@ -0,0 +1,205 @@
+import asyncio
+import json
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from rich.console import Console
+from config import settings
+from history_store import HistoryStore
+from memory import Memory
+import metrics
+
+console = Console()
+
+# (kind, key, value) candidates pulled out of what the user said
+Candidate = Tuple[str, str, str]
+
+# Clause ends at punctuation, a joining word or a time phrase, e.g. "call me Tony and open chrome"
+# or "call me Tony from now on"
+_VALUE = (r"([^.,!?;]+?)(?=\s+(?:and|but|so|because|please|from now on|for now|now|anymore|any more|again|"
+          r"today|tonight|instead)\b|[.,!?;]|$)")
+# Python lookbehinds are fixed-width, so each negation gets its own
+_NOT_NEGATED = r"(?<!don't )(?<!dont )(?<!do not )(?<!never )(?<!stop )"
+RULES = [
+    (re.compile(r"\b(?:don'?t|do not|never|stop) call(?:ing)? me " + _VALUE, re.I), "preference", "avoid_form_of_address"),
+    # The lookbehinds keep "don't call me sir" from also matching here
+    (re.compile(_NOT_NEGATED + r"\bcall me " + _VALUE, re.I), "preference", "form_of_address"),
+    (re.compile(r"\bmy name is " + _VALUE, re.I), "fact", "name"),
+    (re.compile(r"\bi live in " + _VALUE, re.I), "fact", "location"),
+    (re.compile(r"\bi(?:'m| am) from " + _VALUE, re.I), "fact", "hometown"),
+    (re.compile(r"\bi work (?:at|for) " + _VALUE, re.I), "fact", "employer"),
+]
+# "my <thing> is <value>" for things the rules above don't name
+MY_THING = re.compile(r"\bmy ((?:favou?rite )?[a-z]+(?:'s [a-z]+)?) is " + _VALUE, re.I)
+# Only attributes that stay true; "my phone is dead" or "my head is hurting" are passing states.
+# Favourites ("favorite_color") and names ("wife_s_name") are accepted as well.
+STABLE_THINGS = {"birthday", "city", "hometown", "country", "job", "occupation", "profession", "employer",
+                 "email", "nickname", "timezone", "language", "team"}
+# Preferences that contradict each other when they hold the same value
+OPPOSITE_KEYS = {"form_of_address": "avoid_form_of_address", "avoid_form_of_address": "form_of_address"}
+
+EXTRACTION_PROMPT = """You read a user's messages to their assistant and pick out durable facts about the user and their preferences for how the assistant should behave.
+Ignore questions, requests and anything temporary. Use short snake_case keys.
+Reply with JSON only: {"facts": {"key": "value"}, "preferences": {"key": "value"}}"""
+
+def _key(text: str) -> str:
+    return re.sub(r"\W+", "_", text.lower().replace("favourite", "favorite")).strip("_")
+
+def _stable(thing: str) -> bool:
+    return thing in STABLE_THINGS or thing.startswith("favorite_") or thing.endswith("_s_name")
+
+def _same(a, b) -> bool:
+    return a is not None and b is not None and str(a).strip().casefold() == str(b).strip().casefold()
+
+def extract_with_rules(texts: List[str]) -> List[Candidate]:
+    """Facts and preferences stated in plain first-person sentences."""
+    candidates: List[Candidate] = []
+    for text in texts:
+        for sentence in re.split(r"(?<=[.!?])\s+", text.strip()):
+            if sentence.endswith("?"):
+                continue
+            for pattern, kind, key in RULES:
+                for match in pattern.finditer(sentence):
+                    candidates.append((kind, key, match.group(1).strip()))
+            for match in MY_THING.finditer(sentence):
+                thing = _key(match.group(1))
+                if _stable(thing):
+                    candidates.append(("fact", thing, match.group(2).strip()))
+    return [c for c in candidates if c[2]]
+
+class FactExtractor:
+    """Background job that turns conversation history into long-term memory.
+
+    Reads user messages from the HistoryStore past a persisted watermark,
+    extracts candidate facts and preferences a batch at a time (one local
+    rules pass, or one LLM call when FACT_EXTRACTION_MODE is "llm"), and
+    upserts them into Memory. Nothing here runs on the request path: the
+    server drives run() as a startup task and each batch runs in a thread.
+    """
+
+    def __init__(self, history: HistoryStore, memory: Memory, client=None,
+                 state_file: Optional[str] = None, batch_size: Optional[int] = None,
+                 max_wait: Optional[float] = None, mode: Optional[str] = None):
+        self.history = history
+        self.memory = memory
+        self.client = client
+        self.state_file = Path(state_file or settings.FACT_EXTRACTION_STATE)
+        self.batch_size = batch_size or settings.FACT_EXTRACTION_BATCH
+        self.max_wait = settings.FACT_EXTRACTION_MAX_WAIT if max_wait is None else max_wait
+        self.mode = (mode or settings.FACT_EXTRACTION_MODE).lower()
+        self.watermark = self._load_watermark()
+
+    def _load_watermark(self) -> int:
+        """ID of the last history entry already processed (-1 for none)."""
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return int(json.load(f)["watermark"])
+        except FileNotFoundError:
+            return -1
+        except Exception as e:
+            console.print(f"[yellow]Could not read fact extraction state: {e}[/yellow]")
+            return -1
+
+    def _save_watermark(self):
+        tmp_file = self.state_file.with_name(self.state_file.name + ".tmp")
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({"watermark": self.watermark}, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.state_file)
+
+    def _ready(self, batch: List[Dict], flush: bool) -> bool:
+        """A batch runs when it is full, or when its oldest entry has waited max_wait."""
+        if not batch:
+            return False
+        if flush or len(batch) >= self.batch_size:
+            return True
+        try:
+            waited = (datetime.now() - datetime.fromisoformat(batch[0]["timestamp"])).total_seconds()
+        except (KeyError, ValueError):
+            return True
+        return waited >= self.max_wait
+
+    def run_once(self, flush: bool = False) -> int:
+        """Process every ready batch past the watermark. Returns the number of entries upserted."""
+        upserted = 0
+        while True:
+            batch = self.history.page(since=self.watermark, limit=self.batch_size)
+            if not self._ready(batch, flush):
+                return upserted
+            texts = [entry.get("text", "") for entry in batch if entry.get("sender") == "User"]
+            if texts:
+                upserted += self._upsert(self.extract(texts))
+            metrics.FACT_BATCHES.inc(mode=self.mode)
+            self.watermark = batch[-1]["id"]
+            self._save_watermark()
+
+    def extract(self, texts: List[str]) -> List[Candidate]:
+        if self.mode == "llm" and self.client is not None:
+            try:
+                return self._extract_with_llm(texts)
+            except Exception as e:
+                metrics.ERRORS.inc(component="fact_extraction")
+                console.print(f"[yellow]Fact extraction call failed ({e}), using local rules.[/yellow]")
+        return extract_with_rules(texts)
+
+    def _extract_with_llm(self, texts: List[str]) -> List[Candidate]:
+        response = self.client.chat.completions.create(
+            model=settings.FACT_EXTRACTION_MODEL or settings.LLM_MODEL,
+            messages=[
+                {"role": "system", "content": EXTRACTION_PROMPT},
+                {"role": "user", "content": "\n".join(f"- {text}" for text in texts)}
+            ],
+            response_format={"type": "json_object"},
+            temperature=0,
+            timeout=settings.LLM_REQUEST_TIMEOUT
+        )
+        data = json.loads(response.choices[0].message.content or "{}")
+        candidates: List[Candidate] = []
+        for kind, section in (("fact", "facts"), ("preference", "preferences")):
+            for key, value in (data.get(section) or {}).items():
+                if value not in (None, ""):
+                    candidates.append((kind, _key(str(key)), str(value).strip()))
+        return candidates
+
+    def _upsert(self, candidates: List[Candidate]) -> int:
+        # Later statements win, and unchanged values are not rewritten
+        latest: Dict[Tuple[str, str], str] = {}
+        for kind, key, value in candidates:
+            if not key:
+                continue
+            latest.pop((kind, key), None)
+            latest[(kind, key)] = value
+            # "don't call me sir" then "call me sir": only the later one stands
+            opposite = (kind, OPPOSITE_KEYS.get(key))
+            if opposite in latest and _same(latest[opposite], value):
+                del latest[opposite]
+        upserted = 0
+        for (kind, key), value in latest.items():
+            if kind == "fact":
+                if self.memory.recall_fact(key) == value:
+                    continue
+                self.memory.remember_fact(key, value)
+            else:
+                opposite = OPPOSITE_KEYS.get(key)
+                if opposite and _same(self.memory.get_preference(opposite), value):
+                    self.memory.forget_preference(opposite)
+                if self.memory.get_preference(key) == value:
+                    continue
+                self.memory.set_preference(key, value)
+            metrics.FACTS_EXTRACTED.inc(kind=kind)
+            upserted += 1
+        return upserted
+
+    async def run(self, interval: Optional[float] = None):
+        """Check for new history every `interval` seconds until cancelled."""
+        interval = settings.FACT_EXTRACTION_INTERVAL if interval is None else interval
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await asyncio.to_thread(self.run_once)
+            except Exception as e:
+                metrics.ERRORS.inc(component="fact_extraction")
+                console.print(f"[red]Fact extraction failed: {e}[/red]")
@@ -0,0 +1,141 @@
+import math
+import re
+import threading
+import zlib
+from typing import Dict, Hashable, List, Tuple
+
+# NumPy makes top-k a single matrix product; without it we fall back to sparse dot products
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+STOPWORDS = {
+    "a", "an", "the", "is", "are", "am", "was", "be", "i", "you", "it", "to", "of", "in", "on", "and",
+    "or", "for", "with", "what", "do", "does", "my", "me", "your", "that", "this", "please", "jarvis"
+}
+# Character trigrams match misspellings and inflections ("santsh" ~ "santosh")
+TRIGRAM_WEIGHT = 0.5
+
+def _features(text: str) -> Dict[str, float]:
+    features: Dict[str, float] = {}
+    for word in WORD_PATTERN.findall(text.lower()):
+        if word in STOPWORDS:
+            continue
+        features["w:" + word] = features.get("w:" + word, 0.0) + 1.0
+        padded = f"#{word}#"
+        for i in range(len(padded) - 2):
+            key = "c:" + padded[i:i + 3]
+            features[key] = features.get(key, 0.0) + TRIGRAM_WEIGHT
+    return features
+
+def embed(text: str, dim: int = 512) -> Dict[int, float]:
+    """Unit-length signed feature-hashing vector for `text`, as {index: weight}."""
+    vector: Dict[int, float] = {}
+    for feature, weight in _features(text).items():
+        h = zlib.crc32(feature.encode("utf-8"))
+        index = h % dim
+        vector[index] = vector.get(index, 0.0) + (weight if h & 0x80000000 else -weight)
+    norm = math.sqrt(sum(v * v for v in vector.values()))
+    return {i: v / norm for i, v in vector.items()} if norm else {}
+
+class FactIndex:
+    """In-memory vector index over short texts, updated one item at a time.
+
+    Adding an existing id replaces its text, so callers can keep a fixed
+    number of slots (e.g. for recent history) by reusing ids.
+    """
+
+    def __init__(self, dim: int = 512):
+        self.dim = dim
+        self._ids: List[Hashable] = []
+        self._rows: Dict[Hashable, int] = {}
+        self._texts: List[str] = []
+        self._vectors: List[Dict[int, float]] = []
+        self._matrix = np.zeros((64, dim), dtype=np.float32) if NUMPY_AVAILABLE else None
+        self._lock = threading.Lock()
+
+    def add(self, item_id: Hashable, text: str):
+        vector = embed(text, self.dim)
+        with self._lock:
+            row = self._rows.get(item_id)
+            if row is None:
+                row = len(self._ids)
+                self._rows[item_id] = row
+                self._ids.append(item_id)
+                self._texts.append(text)
+            else:
+                self._texts[row] = text
+            if self._matrix is None:
+                if row == len(self._vectors):
+                    self._vectors.append(vector)
+                else:
+                    self._vectors[row] = vector
+            else:
+                if row >= self._matrix.shape[0]:
+                    grown = np.zeros((self._matrix.shape[0] * 2, self.dim), dtype=np.float32)
+                    grown[:self._matrix.shape[0]] = self._matrix
+                    self._matrix = grown
+                self._matrix[row] = 0.0
+                for index, weight in vector.items():
+                    self._matrix[row, index] = weight
+
+    def remove(self, item_id: Hashable):
+        """Drop an item; the last row moves into its place."""
+        with self._lock:
+            row = self._rows.pop(item_id, None)
+            if row is None:
+                return
+            last = len(self._ids) - 1
+            if row != last:
+                moved = self._ids[last]
+                self._ids[row] = moved
+                self._texts[row] = self._texts[last]
+                self._rows[moved] = row
+                if self._matrix is None:
+                    self._vectors[row] = self._vectors[last]
+                else:
+                    self._matrix[row] = self._matrix[last]
+            self._ids.pop()
+            self._texts.pop()
+            if self._matrix is None:
+                self._vectors.pop()
+            else:
+                self._matrix[last] = 0.0
+
+    def search(self, query: str, k: int = 5, min_score: float = 0.0) -> List[Tuple[Hashable, str, float]]:
+        """Top-k (id, text, cosine score) for `query`, best first."""
+        q = embed(query, self.dim)
+        if not q:
+            return []
+        with self._lock:
+            n = len(self._ids)
+            if n == 0:
+                return []
+            if self._matrix is not None:
+                dense = np.zeros(self.dim, dtype=np.float32)
+                for index, weight in q.items():
+                    dense[index] = weight
+                scores = self._matrix[:n] @ dense
+                top = np.argpartition(-scores, min(k, n) - 1)[:k] if n > k else np.arange(n)
+                ranked = sorted(((float(scores[i]), int(i)) for i in top), reverse=True)
+            else:
+                scored = [(sum(w * vector.get(i, 0.0) for i, w in q.items()), row)
+                          for row, vector in enumerate(self._vectors)]
+                ranked = sorted(scored, reverse=True)[:k]
+            return [(self._ids[row], self._texts[row], score) for score, row in ranked if score >= min_score]
+
+    def clear(self):
+        with self._lock:
+            self._ids.clear()
+            self._rows.clear()
+            self._texts.clear()
+            self._vectors.clear()
+            if self._matrix is not None:
+                self._matrix[:] = 0.0
+
+    def __len__(self) -> int:
+        return len(self._ids)
@@ -0,0 +1,173 @@
+import json
+import os
+import threading
+from pathlib import Path
+from datetime import datetime
+from typing import Dict, List, Optional
+from rich.console import Console
+import metrics
+
+console = Console()
+
+class HistoryStore:
+    """Append-only JSONL log of the messages shown in the web HUD.
+
+    Each message is one line, so saving a message is a single O(1) append
+    instead of re-serializing the whole conversation. A message's position
+    in the log never changes, which makes it usable as a stable ID. An
+    in-memory index of line offsets lets pages be read without touching
+    the rest of the file. Lines appended by other processes (e.g. the CLI
+    and the server sharing one log) are picked up before every read and
+    write, so IDs always match line numbers.
+    """
+
+    def __init__(self, log_file: str = "conversation_history.jsonl", legacy_file: Optional[str] = None):
+        self.log_file = Path(log_file)
+        self.legacy_file = Path(legacy_file) if legacy_file else None
+        self._lock = threading.Lock()
+        self._offsets: List[int] = []
+        # Byte offset just past the last indexed line
+        self._end = 0
+        self._migrate_legacy()
+        self._repair_tail()
+        self._build_index()
+
+    def _migrate_legacy(self):
+        """One-time import of the old indent=4 JSON array into the log."""
+        if self.log_file.exists() or not self.legacy_file or not self.legacy_file.exists():
+            return
+        try:
+            with open(self.legacy_file, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except Exception as e:
+            console.print(f"[yellow]Could not migrate history: {e}[/yellow]")
+            return
+
+        # Write to a temp file and rename, so a crash never leaves half a log behind
+        tmp_file = self.log_file.with_name(self.log_file.name + ".tmp")
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            for entry in entries:
+                f.write(self._encode(entry))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.log_file)
+        console.print(f"[dim]Migrated {len(entries)} history entries to {self.log_file}.[/dim]")
+
+    def _repair_tail(self):
+        """Drop a torn last line left behind by a crash mid-append."""
+        if not self.log_file.exists():
+            return
+        with open(self.log_file, 'rb+') as f:
+            data = f.read()
+            if not data or data.endswith(b"\n"):
+                return
+            f.truncate(data.rfind(b"\n") + 1)
+        console.print("[yellow]Discarded incomplete history entry.[/yellow]")
+
+    def _build_index(self):
+        """Record the byte offset of every line, so message N is one seek away."""
+        self._offsets = []
+        self._end = 0
+        self._catch_up()
+
+    def _catch_up(self, stop: Optional[int] = None):
+        """Index complete lines written since the last indexed one, up to byte `stop`."""
+        try:
+            size = self.log_file.stat().st_size
+        except FileNotFoundError:
+            return
+        stop = size if stop is None else min(stop, size)
+        if stop <= self._end:
+            return
+        with open(self.log_file, 'rb') as f:
+            f.seek(self._end)
+            pos = self._end
+            for line in f:
+                # A line still being written by another process is indexed next time
+                if pos + len(line) > stop or not line.endswith(b"\n"):
+                    break
+                self._offsets.append(pos)
+                pos += len(line)
+        self._end = pos
+
+    @staticmethod
+    def _encode(entry: Dict) -> str:
+        return json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+    def append(self, sender: str, text: str) -> Dict:
+        """Durably append one message to the log."""
+        entry = {"sender": sender, "text": text, "timestamp": datetime.now().isoformat()}
+        line = self._encode(entry).encode("utf-8")
+        with self._lock, metrics.HISTORY_IO.time(op="append"):
+            # O_APPEND keeps concurrent writers from clobbering each other's lines
+            fd = os.open(self.log_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+                os.fsync(fd)
+                end = os.lseek(fd, 0, os.SEEK_CUR)
+            finally:
+                os.close(fd)
+            # Index anything another process appended ahead of this line first
+            self._catch_up(end - len(line))
+            entry["id"] = len(self._offsets)
+            self._offsets.append(end - len(line))
+            self._end = end
+        return entry
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._catch_up()
+            return len(self._offsets)
+
+    def _read_range(self, start: int, stop: int) -> List[Dict]:
+        """Read messages with IDs in [start, stop) using the offset index."""
+        if start >= stop:
+            return []
+        entries = []
+        with open(self.log_file, 'rb') as f:
+            f.seek(self._offsets[start])
+            for msg_id in range(start, stop):
+                line = f.readline()
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                entry["id"] = msg_id
+                entries.append(entry)
+        return entries
+
+    def page(self, before: Optional[int] = None, since: Optional[int] = None, limit: int = 50) -> List[Dict]:
+        """Return a window of messages, oldest first.
+
+        Args:
+            before: Only messages with an ID lower than this (scrolling back).
+            since: Only messages with an ID higher than this (delta sync).
+            limit: Maximum number of messages to return.
+
+        With neither cursor the most recent `limit` messages are returned.
+        """
+        with self._lock, metrics.HISTORY_IO.time(op="page"):
+            self._catch_up()
+            total = len(self._offsets)
+            if since is not None:
+                start = max(since + 1, 0)
+                stop = min(start + limit, total)
+            else:
+                stop = total if before is None else max(min(before, total), 0)
+                start = max(stop - limit, 0)
+            return self._read_range(start, stop)
+
+    def load(self) -> List[Dict]:
+        """Read every message in the log, oldest first."""
+        if not self.log_file.exists():
+            return []
+        entries = []
+        with open(self.log_file, 'r', encoding='utf-8') as f:
+            for msg_id, line in enumerate(f):
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                entry["id"] = msg_id
+                entries.append(entry)
+        return entries
@@ -0,0 +1,96 @@
+import re
+from typing import Callable, Dict, List, Optional, Tuple
+import metrics
+
+# Words that carry no meaning for intent matching
+FILLER = re.compile(r"^(hey |ok |okay )?(jarvis[, ]+)?(please |can you |could you )*|( please| jarvis)+$")
+
+TIME_PATTERNS = [
+    re.compile(r"what(?:'?s| is) the (?:current )?time(?: now| right now)?"),
+    re.compile(r"what time is it(?: now| right now)?"),
+    re.compile(r"(?:tell me the |the )?(?:current )?time(?: now| please)?"),
+]
+DATE_PATTERNS = [
+    re.compile(r"what(?:'?s| is) (?:the date|today'?s date)(?: today)?"),
+    re.compile(r"what date is it(?: today)?"),
+    re.compile(r"(?:tell me )?today'?s date"),
+]
+DAY_PATTERNS = [
+    re.compile(r"what day is (?:it|today)(?: today)?"),
+    re.compile(r"what(?:'?s| is) (?:the )?day(?: today)?"),
+]
+OPEN_PATTERN = re.compile(r"(?:please )?open (chrome|notepad)[.!]?")
+
+MATH_PREFIX = re.compile(r"^(what(?:'?s| is)|calculate|compute|solve|evaluate)\s+")
+MATH_WORDS = [
+    (re.compile(r"\bmultiplied by\b|\btimes\b|(?<=\d)\s*x\s*(?=\d)"), "*"),
+    (re.compile(r"\bdivided by\b|\bover\b"), "/"),
+    (re.compile(r"\bplus\b"), "+"),
+    (re.compile(r"\bminus\b"), "-"),
+]
+# Numbers joined by single + - * / operators, nothing else (no ** powers)
+MATH_EXPRESSION = re.compile(r"^[\s(]*-?\d+(\.\d+)?[\s)]*([+\-*/][\s(]*-?\d+(\.\d+)?[\s)]*)+$")
+
+class IntentRouter:
+    """Answers deterministic requests from local skills, without an LLM round trip.
+
+    Each route only fires on a full match of the normalized request, so
+    anything it is not sure about returns None and falls through to the
+    model.
+    """
+
+    def __init__(self):
+        self.routes: List[Tuple[str, Callable[[str, Dict], Optional[str]]]] = [
+            ("open_app", self._open_app),
+            ("time", self._time),
+            ("calculator", self._calculate),
+        ]
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        text = text.lower().strip().rstrip("?.!").strip()
+        return FILLER.sub("", text).strip()
+
+    def route(self, text: str, skills: Dict = None) -> Optional[str]:
+        """Return a finished reply, or None if the LLM should handle it."""
+        if not skills:
+            return None
+        normalized = self._normalize(text)
+        for intent, handler in self.routes:
+            if intent not in skills:
+                continue
+            reply = handler(normalized, skills)
+            if reply is not None:
+                metrics.INTENT_ROUTES.inc(intent=intent)
+                return reply
+        return None
+
+    @staticmethod
+    def _open_app(text: str, skills: Dict) -> Optional[str]:
+        match = OPEN_PATTERN.fullmatch(text)
+        if not match:
+            return None
+        return skills["open_app"].execute(match.group(1))
+
+    @staticmethod
+    def _time(text: str, skills: Dict) -> Optional[str]:
+        if any(p.fullmatch(text) for p in TIME_PATTERNS):
+            return f"It's {skills['time'].execute('time')}, Sir."
+        if any(p.fullmatch(text) for p in DATE_PATTERNS):
+            return f"Today is {skills['time'].execute('date')}, Sir."
+        if any(p.fullmatch(text) for p in DAY_PATTERNS):
+            return f"It's {skills['time'].execute('day')}, Sir."
+        return None
+
+    @staticmethod
+    def _calculate(text: str, skills: Dict) -> Optional[str]:
+        expression = MATH_PREFIX.sub("", text).rstrip("= ").strip()
+        for pattern, operator in MATH_WORDS:
+            expression = pattern.sub(f" {operator} ", expression)
+        expression = re.sub(r"\s+", " ", expression).strip()
+        if not MATH_EXPRESSION.fullmatch(expression):
+            return None
+        result = skills["calculator"].execute(expression)
+        if result.startswith("Error"):
+            return None
+        return result
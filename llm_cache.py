@@ -0,0 +1,74 @@
+import hashlib
+import json
+import re
+from typing import Any, Dict, List, Optional
+from cache import TTLCache
+
+# Answers built from these tools go stale in minutes, so they are never cached
+REALTIME_TOOLS = {"search", "web_search", "google_search"}
+
+def _as_dict(message: Any) -> Dict:
+    if isinstance(message, dict):
+        return message
+    return message.model_dump(exclude_none=True)
+
+def _normalize_text(text: Optional[str]) -> Optional[str]:
+    """Case and whitespace don't change the answer to "Hi  there" vs "hi there"."""
+    if text is None:
+        return None
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+class ResponseCache:
+    """Caches final LLM answers keyed on (model, messages, tools, temperature).
+
+    Only plain text answers are stored; rounds that request tool calls are
+    always sent to the model, and turns that consulted a real-time tool
+    bypass the cache entirely.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl: float = 3600, disk_path: Optional[str] = None):
+        self.cache = TTLCache("llm", max_entries=max_entries, ttl=ttl, disk_path=disk_path)
+        self.bypassed = 0
+
+    @staticmethod
+    def _current_turn(messages: List[Any]) -> List[Dict]:
+        """Messages after the latest user message."""
+        turn = []
+        for message in reversed(messages):
+            message = _as_dict(message)
+            if message.get("role") == "user":
+                break
+            turn.append(message)
+        return turn
+
+    def cacheable(self, messages: List[Any]) -> bool:
+        for message in self._current_turn(messages):
+            if message.get("role") == "tool" and message.get("name") in REALTIME_TOOLS:
+                return False
+        return True
+
+    @staticmethod
+    def key(model: str, messages: List[Any], tools: List[Dict], temperature: float) -> str:
+        normalized = []
+        for message in messages:
+            message = dict(_as_dict(message))
+            message["content"] = _normalize_text(message.get("content"))
+            normalized.append(message)
+        payload = json.dumps(
+            {"model": model, "messages": normalized, "tools": tools, "temperature": temperature},
+            sort_keys=True, ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, model: str, messages: List[Any], tools: List[Dict], temperature: float) -> Optional[str]:
+        if not self.cacheable(messages):
+            self.bypassed += 1
+            return None
+        return self.cache.get(self.key(model, messages, tools, temperature))
+
+    def put(self, model: str, messages: List[Any], tools: List[Dict], temperature: float, content: str):
+        if content and self.cacheable(messages):
+            self.cache.set(self.key(model, messages, tools, temperature), content)
+
+    def stats(self) -> Dict:
+        return dict(self.cache.stats(), bypassed=self.bypassed)
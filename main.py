@@ -15,7 +15,8 @@ import pygetwindow as gw
 from config import settings
 from brain import Brain
 from memory import Memory
-from skills import TimeSkill, CalculatorSkill, WebSearchSkill, GoogleSearchSkill
+from history_store import HistoryStore
+from skills import SkillRegistry
 
 # Try to import voice modules, but allow running without them
 try:
@@ -44,18 +45,13 @@ class Jarvis:
             voice_mode = False
             
         self.voice_mode = voice_mode
-        self.brain = Brain()
         self.memory = Memory()
+        self.brain = Brain(memory=self.memory)
         self.voice = Voice(settings.VOICE_ID) if VOICE_AVAILABLE and voice_mode else None
         self.ears = Ears(device_index=settings.MIC_INDEX) if VOICE_AVAILABLE and voice_mode else None
         
-        # Load skills
-        self.skills = {
-            "time": TimeSkill(),
-            "calculator": CalculatorSkill(),
-            "web_search": WebSearchSkill(),
-            "google_search": GoogleSearchSkill()
-        }
+        # Skills are found by scanning the skills package and plugins; each is imported on first use
+        self.skills = SkillRegistry.discover(exclude=settings.SKILLS_DISABLED.split(","))
         
     def respond(self, text: str):
         """Generate and deliver a response."""
@@ -254,6 +250,8 @@ def main(
         return
     
     jarvis = Jarvis(voice_mode=voice)
+    # Turns that age out of the in-memory conversation are kept in the history log
+    jarvis.brain.conversation_history.spill = HistoryStore(settings.HISTORY_LOG, legacy_file=settings.HISTORY_LEGACY_FILE).append
     
     if voice and VOICE_AVAILABLE:
         jarvis.run_voice_mode()
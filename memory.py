@@ -1,84 +1,455 @@
+import atexit
 import json
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from rich.console import Console
 from datetime import datetime
+from config import settings
+from fact_index import FactIndex
+import metrics
 
 console = Console()
 
-class Memory:
-    """Manages long-term memory and user preferences."""
-    
-    def __init__(self, memory_file: str = "memory.json"):
+def _empty() -> Dict[str, Any]:
+    return {"facts": {}, "preferences": {}, "history": []}
+
+class MemoryBackend(ABC):
+    """Storage for facts, preferences and interaction history."""
+
+    @abstractmethod
+    def get_fact(self, key: str) -> Optional[Dict[str, Any]]:
+        """The {"value", "timestamp"} record for a fact, or None."""
+        pass
+
+    @abstractmethod
+    def set_fact(self, key: str, value: Any, timestamp: str):
+        pass
+
+    @abstractmethod
+    def all_facts(self) -> Dict[str, Any]:
+        pass
+
+    @abstractmethod
+    def get_preference(self, key: str, default: Any = None) -> Any:
+        pass
+
+    @abstractmethod
+    def set_preference(self, key: str, value: Any):
+        pass
+
+    @abstractmethod
+    def delete_preference(self, key: str):
+        pass
+
+    @abstractmethod
+    def all_preferences(self) -> Dict[str, Any]:
+        pass
+
+    @abstractmethod
+    def add_history(self, entry: str, timestamp: str):
+        pass
+
+    @abstractmethod
+    def history(self, since: Optional[str] = None, until: Optional[str] = None,
+                limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Entries with since <= timestamp < until (ISO strings), oldest first."""
+        pass
+
+    @abstractmethod
+    def clear(self):
+        pass
+
+    def flush(self):
+        """Make pending changes durable."""
+        pass
+
+    def close(self):
+        self.flush()
+
+    def write_stats(self) -> Dict[str, Any]:
+        return {}
+
+class JSONMemoryBackend(MemoryBackend):
+    """Everything in one JSON file, kept in memory and written behind.
+
+    Mutations within `write_delay` seconds are coalesced into one atomic
+    rewrite of the file (temp file + os.replace). A delay of 0 writes
+    through on every change. History is capped at 100 entries.
+    """
+
+    HISTORY_LIMIT = 100
+
+    def __init__(self, memory_file: str = "memory.json", write_delay: float = 0.5):
         self.memory_file = Path(memory_file)
-        self.data: Dict[str, Any] = self._load()
-        
-    def _load(self) -> Dict[str, Any]:
-        """Load memory from file."""
-        if self.memory_file.exists():
+        self.write_delay = write_delay
+        self._lock = threading.RLock()
+        self._timer: Optional[threading.Timer] = None
+        self._dirty = False
+        # Write amplification counters
+        self.mutations = 0
+        self.flushes = 0
+        self.bytes_written = 0
+        self.data: Dict[str, Any] = load_json_memory(self.memory_file)
+
+    def _save(self):
+        """Record a mutation and schedule a flush."""
+        with self._lock:
+            self.mutations += 1
+            metrics.MEMORY_MUTATIONS.inc()
+            self._dirty = True
+            if self.write_delay <= 0:
+                self.flush()
+            elif self._timer is None:
+                # Not reset by later mutations, so a busy writer still flushes every write_delay
+                self._timer = threading.Timer(self.write_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        """Write pending changes to disk atomically."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return
+            payload = json.dumps(self.data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            tmp_path = self.memory_file.with_name(self.memory_file.name + ".tmp")
             try:
-                with open(self.memory_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                with open(tmp_path, 'wb') as f:
+                    f.write(payload)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.memory_file)
             except Exception as e:
-                console.print(f"[yellow]Could not load memory: {e}[/yellow]")
-                return {"facts": {}, "preferences": {}, "history": []}
-        return {"facts": {}, "preferences": {}, "history": []}
-    
-    def _save(self):
-        """Save memory to file."""
+                console.print(f"[red]Could not save memory: {e}[/red]")
+                return
+            self._dirty = False
+            self.flushes += 1
+            self.bytes_written += len(payload)
+            metrics.MEMORY_FLUSHES.inc()
+            metrics.MEMORY_BYTES_WRITTEN.inc(len(payload))
+
+    def write_stats(self) -> Dict[str, Any]:
+        """How much disk I/O the mutations so far have cost."""
+        with self._lock:
+            return {
+                "mutations": self.mutations,
+                "flushes": self.flushes,
+                "bytes_written": self.bytes_written,
+                "mutations_per_flush": self.mutations / self.flushes if self.flushes else 0.0,
+                "bytes_per_mutation": self.bytes_written / self.mutations if self.mutations else 0.0,
+                "pending": self._dirty
+            }
+
+    # Readers take the lock too: the flusher serializes self.data from its timer thread
+
+    def get_fact(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self.data["facts"].get(key)
+
+    def set_fact(self, key: str, value: Any, timestamp: str):
+        with self._lock:
+            self.data["facts"][key] = {"value": value, "timestamp": timestamp}
+            self._save()
+
+    def all_facts(self) -> Dict[str, Any]:
+        with self._lock:
+            return {k: v["value"] for k, v in self.data["facts"].items()}
+
+    def get_preference(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            return self.data["preferences"].get(key, default)
+
+    def set_preference(self, key: str, value: Any):
+        with self._lock:
+            self.data["preferences"][key] = value
+            self._save()
+
+    def delete_preference(self, key: str):
+        with self._lock:
+            if self.data["preferences"].pop(key, None) is not None:
+                self._save()
+
+    def all_preferences(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self.data["preferences"])
+
+    def add_history(self, entry: str, timestamp: str):
+        with self._lock:
+            self.data["history"].append({"entry": entry, "timestamp": timestamp})
+            # Keep only last 100 entries
+            if len(self.data["history"]) > self.HISTORY_LIMIT:
+                del self.data["history"][:-self.HISTORY_LIMIT]
+            self._save()
+
+    def history(self, since: Optional[str] = None, until: Optional[str] = None,
+                limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            entries = [
+                h for h in self.data["history"]
+                if (since is None or h["timestamp"] >= since) and (until is None or h["timestamp"] < until)
+            ]
+        return entries[-limit:] if limit else entries
+
+    def clear(self):
+        with self._lock:
+            self.data = _empty()
+            self._save()
+
+class SQLiteMemoryBackend(MemoryBackend):
+    """SQLite (WAL) storage with indexed lookups and unbounded history.
+
+    WAL mode plus a busy timeout lets several processes (the CLI and the
+    server, say) read and write the same database. If `legacy_file` holds
+    a memory.json from the JSON backend, it is imported once and renamed
+    to *.migrated.
+    """
+
+    def __init__(self, db_path: str = "memory.db", legacy_file: Optional[str] = None):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.mutations = 0
+        self._db = sqlite3.connect(str(self.db_path), check_same_thread=False, isolation_level=None, timeout=10)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS facts (key TEXT PRIMARY KEY, value TEXT NOT NULL, timestamp TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS preferences (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, entry TEXT NOT NULL, timestamp TEXT NOT NULL);
+            CREATE INDEX IF NOT EXISTS history_timestamp ON history (timestamp);
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+        """)
+        if legacy_file:
+            self._migrate(Path(legacy_file))
+
+    def _migrate(self, legacy_file: Path):
+        if not legacy_file.exists():
+            return
+        data = load_json_memory(legacy_file)
+        with self._lock:
+            # IMMEDIATE takes the write lock, so two processes can't both import
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                if self._db.execute("SELECT 1 FROM meta WHERE key = 'migrated_from'").fetchone():
+                    self._db.execute("ROLLBACK")
+                    return
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO facts (key, value, timestamp) VALUES (?, ?, ?)",
+                    [(k, json.dumps(v.get("value"), ensure_ascii=False), v.get("timestamp", ""))
+                     for k, v in data.get("facts", {}).items()]
+                )
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO preferences (key, value) VALUES (?, ?)",
+                    [(k, json.dumps(v, ensure_ascii=False)) for k, v in data.get("preferences", {}).items()]
+                )
+                self._db.executemany(
+                    "INSERT INTO history (entry, timestamp) VALUES (?, ?)",
+                    [(h.get("entry", ""), h.get("timestamp", "")) for h in data.get("history", [])]
+                )
+                self._db.execute("INSERT INTO meta (key, value) VALUES ('migrated_from', ?)", (str(legacy_file),))
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+        legacy_file.replace(legacy_file.with_name(legacy_file.name + ".migrated"))
+        console.print(f"[dim]Migrated {legacy_file} into {self.db_path}[/dim]")
+
+    def _write(self, sql: str, params: tuple = ()):
+        with self._lock:
+            self._db.execute(sql, params)
+            self.mutations += 1
+        metrics.MEMORY_MUTATIONS.inc()
+
+    def _read(self, sql: str, params: tuple = ()) -> List[tuple]:
+        with self._lock:
+            return self._db.execute(sql, params).fetchall()
+
+    def get_fact(self, key: str) -> Optional[Dict[str, Any]]:
+        rows = self._read("SELECT value, timestamp FROM facts WHERE key = ?", (key,))
+        return {"value": json.loads(rows[0][0]), "timestamp": rows[0][1]} if rows else None
+
+    def set_fact(self, key: str, value: Any, timestamp: str):
+        self._write("INSERT OR REPLACE INTO facts (key, value, timestamp) VALUES (?, ?, ?)",
+                    (key, json.dumps(value, ensure_ascii=False), timestamp))
+
+    def all_facts(self) -> Dict[str, Any]:
+        return {k: json.loads(v) for k, v in self._read("SELECT key, value FROM facts ORDER BY timestamp")}
+
+    def get_preference(self, key: str, default: Any = None) -> Any:
+        rows = self._read("SELECT value FROM preferences WHERE key = ?", (key,))
+        return json.loads(rows[0][0]) if rows else default
+
+    def set_preference(self, key: str, value: Any):
+        self._write("INSERT OR REPLACE INTO preferences (key, value) VALUES (?, ?)",
+                    (key, json.dumps(value, ensure_ascii=False)))
+
+    def delete_preference(self, key: str):
+        self._write("DELETE FROM preferences WHERE key = ?", (key,))
+
+    def all_preferences(self) -> Dict[str, Any]:
+        return {k: json.loads(v) for k, v in self._read("SELECT key, value FROM preferences")}
+
+    def add_history(self, entry: str, timestamp: str):
+        self._write("INSERT INTO history (entry, timestamp) VALUES (?, ?)", (entry, timestamp))
+
+    def history(self, since: Optional[str] = None, until: Optional[str] = None,
+                limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        clauses, params = [], []
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("timestamp < ?")
+            params.append(until)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._read(
+            f"SELECT entry, timestamp FROM history {where} ORDER BY id DESC LIMIT ?",
+            (*params, limit if limit else -1)
+        )
+        return [{"entry": entry, "timestamp": timestamp} for entry, timestamp in reversed(rows)]
+
+    def clear(self):
+        with self._lock:
+            self._db.executescript("BEGIN; DELETE FROM facts; DELETE FROM preferences; DELETE FROM history; COMMIT;")
+            self.mutations += 1
+        metrics.MEMORY_MUTATIONS.inc()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def write_stats(self) -> Dict[str, Any]:
+        return {"mutations": self.mutations}
+
+def load_json_memory(path: Path) -> Dict[str, Any]:
+    """Read a memory.json, falling back to empty memory if it is missing or unreadable."""
+    if path.exists():
         try:
-            with open(self.memory_file, 'w', encoding='utf-8') as f:
-                json.dump(self.data, f, indent=2, ensure_ascii=False)
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
         except Exception as e:
-            console.print(f"[red]Could not save memory: {e}[/red]")
-    
+            console.print(f"[yellow]Could not load memory: {e}[/yellow]")
+    return _empty()
+
+def create_backend(memory_file: str, write_delay: Optional[float] = None) -> MemoryBackend:
+    """The backend selected by MEMORY_BACKEND for `memory_file`.
+
+    With the SQLite backend the database sits next to the JSON file
+    (memory.json -> memory.db) and the JSON file is migrated into it.
+    """
+    if settings.MEMORY_BACKEND == "json":
+        return JSONMemoryBackend(memory_file, settings.MEMORY_WRITE_DELAY if write_delay is None else write_delay)
+    path = Path(memory_file)
+    if path.suffix == ".json":
+        return SQLiteMemoryBackend(str(path.with_suffix(".db")), legacy_file=str(path))
+    return SQLiteMemoryBackend(str(path))
+
+class Memory:
+    """Manages long-term memory and user preferences.
+
+    Storage is delegated to a MemoryBackend (SQLite by default, see
+    MEMORY_BACKEND). Facts, preferences and recent history are also kept
+    in a FactIndex so relevant() can find them by meaning rather than by
+    exact key. Call close() on shutdown; it also runs at interpreter exit.
+    """
+
+    def __init__(self, memory_file: str = "memory.json", write_delay: Optional[float] = None,
+                 backend: Optional[MemoryBackend] = None):
+        self.memory_file = Path(memory_file)
+        self.backend = backend or create_backend(memory_file, write_delay)
+        self.index = FactIndex(settings.MEMORY_INDEX_DIM)
+        self._history_slot = 0
+        self._build_index()
+        atexit.register(self.close)
+
+    def _build_index(self):
+        for key, value in self.backend.all_facts().items():
+            self.index.add(("fact", key), f"{key}: {value}")
+        for key, value in self.backend.all_preferences().items():
+            self.index.add(("preference", key), f"{key}: {value}")
+        for entry in self.backend.history(limit=settings.MEMORY_INDEX_HISTORY):
+            self._index_history(entry["entry"])
+
+    def _index_history(self, entry: str):
+        # Recent history reuses a fixed ring of slots, so the index stays bounded
+        self.index.add(("history", self._history_slot), entry)
+        self._history_slot = (self._history_slot + 1) % max(1, settings.MEMORY_INDEX_HISTORY)
+
+    def relevant(self, query: str, k: int = 5, min_score: float = 0.2) -> List[str]:
+        """The k stored facts, preferences and history entries most related to `query`."""
+        return [text for _, text, _ in self.index.search(query, k, min_score)]
+
     def remember_fact(self, key: str, value: Any):
         """Store a fact in long-term memory."""
-        self.data["facts"][key] = {
-            "value": value,
-            "timestamp": datetime.now().isoformat()
-        }
-        self._save()
+        self.backend.set_fact(key, value, datetime.now().isoformat())
+        self.index.add(("fact", key), f"{key}: {value}")
         console.print(f"[green]Remembered: {key} = {value}[/green]")
-    
+
     def recall_fact(self, key: str) -> Optional[Any]:
         """Retrieve a fact from memory."""
-        fact = self.data["facts"].get(key)
+        fact = self.backend.get_fact(key)
         if fact:
             return fact["value"]
         return None
-    
+
     def set_preference(self, key: str, value: Any):
         """Set a user preference."""
-        self.data["preferences"][key] = value
-        self._save()
+        self.backend.set_preference(key, value)
+        self.index.add(("preference", key), f"{key}: {value}")
         console.print(f"[green]Preference set: {key} = {value}[/green]")
-    
+
+    def forget_preference(self, key: str):
+        """Remove a user preference."""
+        self.backend.delete_preference(key)
+        self.index.remove(("preference", key))
+        console.print(f"[yellow]Preference removed: {key}[/yellow]")
+
     def get_preference(self, key: str, default: Any = None) -> Any:
         """Get a user preference."""
-        return self.data["preferences"].get(key, default)
-    
+        return self.backend.get_preference(key, default)
+
     def add_to_history(self, entry: str):
         """Add an entry to interaction history."""
-        self.data["history"].append({
-            "entry": entry,
-            "timestamp": datetime.now().isoformat()
-        })
-        # Keep only last 100 entries
-        if len(self.data["history"]) > 100:
-            self.data["history"] = self.data["history"][-100:]
-        self._save()
-    
+        self.backend.add_history(entry, datetime.now().isoformat())
+        self._index_history(entry)
+
+    def get_history(self, since: Optional[datetime] = None, until: Optional[datetime] = None,
+                    limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """History entries in [since, until), oldest first; `limit` keeps the newest."""
+        return self.backend.history(
+            since.isoformat() if since else None, until.isoformat() if until else None, limit
+        )
+
     def get_all_facts(self) -> Dict[str, Any]:
         """Get all stored facts."""
-        return {k: v["value"] for k, v in self.data["facts"].items()}
-    
+        return self.backend.all_facts()
+
     def get_all_preferences(self) -> Dict[str, Any]:
         """Get all preferences."""
-        return self.data["preferences"]
-    
+        return self.backend.all_preferences()
+
     def clear_all(self):
         """Clear all memory."""
-        self.data = {"facts": {}, "preferences": {}, "history": []}
-        self._save()
+        self.backend.clear()
+        self.index.clear()
+        self._history_slot = 0
         console.print("[yellow]All memory cleared.[/yellow]")
+
+    def flush(self):
+        """Make pending changes durable."""
+        self.backend.flush()
+
+    def close(self):
+        """Flush pending changes; call on shutdown."""
+        self.backend.close()
+
+    def write_stats(self) -> Dict[str, Any]:
+        """How much disk I/O the mutations so far have cost."""
+        return self.backend.write_stats()
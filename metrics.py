@@ -0,0 +1,182 @@
+"""
+Minimal Prometheus-format metrics for Jarvis.
+
+Metrics are process-global and thread-safe, so the Brain, the skills and
+the history store can record into them from the event loop or from
+worker threads. server.py exposes them on /api/metrics.
+"""
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+def _label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+def _format_labels(key: LabelKey, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+    pairs = key + extra
+    if not pairs:
+        return ""
+    escaped = (v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value))
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self._lock = threading.Lock()
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"]
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+    kind = "counter"
+
+    def __init__(self, name: str, description: str):
+        super().__init__(name, description)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [f"{self.name}{_format_labels(k)} {_format_value(v)}" for k, v in items]
+
+class Gauge(_Metric):
+    """Value read from a callback at scrape time."""
+    kind = "gauge"
+
+    def __init__(self, name: str, description: str, callback: Callable[[], float]):
+        super().__init__(name, description)
+        self.callback = callback
+
+    def render(self) -> List[str]:
+        return self.header() + [f"{self.name} {_format_value(self.callback())}"]
+
+class Histogram(_Metric):
+    """Latency distribution with cumulative buckets, in seconds."""
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, description)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._series: Dict[LabelKey, List[float]] = {}
+
+    def observe(self, value: float, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            # Per-bucket counts followed by sum and count
+            series = self._series.setdefault(key, [0.0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of a block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels) -> float:
+        series = self._series.get(_label_key(labels))
+        return series[-1] if series else 0.0
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        with self._lock:
+            items = [(k, list(v)) for k, v in self._series.items()]
+        for key, series in items:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(key, (('le', _format_value(bound)),))} {_format_value(cumulative)}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {_format_value(series[-1])}")
+        return lines
+
+class Registry:
+    """Collection of metrics rendered together in the text exposition format."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+REGISTRY = Registry()
+
+REQUEST_LATENCY = REGISTRY.register(Histogram(
+    "jarvis_request_duration_seconds", "End-to-end latency of chat requests."))
+LLM_LATENCY = REGISTRY.register(Histogram(
+    "jarvis_llm_request_duration_seconds", "Duration of each LLM round-trip in the think loop."))
+LLM_FIRST_TOKEN = REGISTRY.register(Histogram(
+    "jarvis_llm_first_token_seconds", "Time to the first streamed token of an LLM round-trip."))
+PROMPT_TOKENS = REGISTRY.register(Histogram(
+    "jarvis_prompt_tokens", "Tokens in each prompt sent to the LLM.",
+    buckets=(250, 500, 1000, 1500, 2000, 3000, 4000, 8000, 16000)))
+TOOL_LATENCY = REGISTRY.register(Histogram(
+    "jarvis_tool_duration_seconds", "Duration of each skill execute call."))
+ADMISSION_WAIT = REGISTRY.register(Histogram(
+    "jarvis_admission_wait_seconds", "Time chat requests spent queued for a concurrency slot."))
+HISTORY_IO = REGISTRY.register(Histogram(
+    "jarvis_history_io_seconds", "Duration of conversation history reads and writes."))
+CACHE_REQUESTS = REGISTRY.register(Counter(
+    "jarvis_cache_requests_total", "Cache lookups by cache and result (hit, disk_hit, stale, miss)."))
+INTENT_ROUTES = REGISTRY.register(Counter(
+    "jarvis_intent_routes_total", "Requests answered locally by the intent router, by intent."))
+TOOL_TOKENS_SAVED = REGISTRY.register(Counter(
+    "jarvis_tool_result_tokens_saved_total", "Prompt tokens removed from tool results by compaction, by tool."))
+PREFETCH = REGISTRY.register(Counter(
+    "jarvis_search_prefetch_total", "Speculative searches by outcome (hit, unused, failed)."))
+MEMORY_MUTATIONS = REGISTRY.register(Counter(
+    "jarvis_memory_mutations_total", "Changes made to long-term memory."))
+MEMORY_FLUSHES = REGISTRY.register(Counter(
+    "jarvis_memory_flushes_total", "Times long-term memory was written to disk."))
+MEMORY_BYTES_WRITTEN = REGISTRY.register(Counter(
+    "jarvis_memory_bytes_written_total", "Bytes written to disk for long-term memory."))
+FACT_BATCHES = REGISTRY.register(Counter(
+    "jarvis_fact_extraction_batches_total", "History batches processed by fact extraction, by mode."))
+FACTS_EXTRACTED = REGISTRY.register(Counter(
+    "jarvis_facts_extracted_total", "Facts and preferences written to memory by fact extraction, by kind."))
+LLM_RETRIES = REGISTRY.register(Counter(
+    "jarvis_llm_retries_total", "LLM calls retried after a transient error, by model."))
+LLM_FALLBACKS = REGISTRY.register(Counter(
+    "jarvis_llm_fallbacks_total", "Times a model failed and the next one in the chain was tried."))
+THINK_ITERATIONS = REGISTRY.register(Counter(
+    "jarvis_think_iterations_total", "LLM round-trips made by the think loop."))
+ERRORS = REGISTRY.register(Counter(
+    "jarvis_errors_total", "Errors, by component."))
@@ -0,0 +1,105 @@
+import concurrent.futures
+import json
+import re
+import time
+from typing import Dict, Optional, Set
+from rich.console import Console
+import metrics
+from intent_router import FILLER
+
+console = Console()
+
+# Questions whose answer the model will almost certainly look up
+REALTIME_PATTERN = re.compile(
+    r"\b(news|headlines?|weather|forecast|temperature|raining|price|prices|stocks?|share price|"
+    r"bitcoin|crypto|exchange rate|scores?|latest|today'?s|tonight|currently|right now|this week)\b"
+)
+SEARCH_TOOLS = ("search", "google_search", "web_search")
+STOPWORDS = {
+    "a", "an", "the", "is", "are", "was", "what", "whats", "s", "in", "on", "at", "for", "of", "to",
+    "me", "tell", "show", "find", "search", "please", "about", "how", "and", "jarvis", "sir"
+}
+
+def query_terms(text: str) -> Set[str]:
+    return {word for word in re.findall(r"\w+", text.lower()) if word not in STOPWORDS}
+
+def similarity(a: str, b: str) -> float:
+    """Jaccard overlap of the meaningful words in two queries."""
+    terms_a, terms_b = query_terms(a), query_terms(b)
+    if not terms_a or not terms_b:
+        return 0.0
+    return len(terms_a & terms_b) / len(terms_a | terms_b)
+
+class Prefetch:
+    """One speculative search started alongside the first LLM call of a turn."""
+
+    def __init__(self, tool: str, query: str, future: concurrent.futures.Future):
+        self.tool = tool
+        self.query = query
+        self.future = future
+        self.used = False
+
+    def matches(self, tool: str, arguments: str, threshold: float) -> bool:
+        # Only the tool that was prefetched: google_search and web_search return different results
+        if self.used or tool != self.tool:
+            return False
+        try:
+            query = (json.loads(arguments) if arguments else {}).get("query", "")
+        except json.JSONDecodeError:
+            return False
+        return similarity(self.query, query) >= threshold
+
+class SearchPrefetcher:
+    """Starts a search for real-time questions before the model asks for it.
+
+    If the model then calls a search tool with a matching query, the
+    prefetched result is served instead of running the search again;
+    otherwise it is discarded.
+    """
+
+    def __init__(self, executor: concurrent.futures.Executor, threshold: float = 0.5):
+        self.executor = executor
+        self.threshold = threshold
+
+    @staticmethod
+    def predict(text: str) -> Optional[str]:
+        """The query to prefetch for `text`, or None if no search is expected."""
+        query = FILLER.sub("", text.lower().strip().rstrip("?.!").strip()).strip()
+        if not query or not REALTIME_PATTERN.search(query):
+            return None
+        return query
+
+    def start(self, text: str, skills: Dict = None) -> Optional[Prefetch]:
+        query = self.predict(text)
+        tool = next((name for name in SEARCH_TOOLS if skills and name in skills), None)
+        if query is None or tool is None:
+            return None
+        console.print(f"[dim]Prefetching {tool}({query!r})[/dim]")
+        future = self.executor.submit(self._search, skills[tool], tool, query)
+        return Prefetch(tool, query, future)
+
+    @staticmethod
+    def _search(skill, tool: str, query: str) -> str:
+        with metrics.TOOL_LATENCY.time(tool=tool):
+            return str(skill.execute(query=query))
+
+    def take(self, prefetch: Optional[Prefetch], tool: str, arguments: str, timeout: float) -> Optional[str]:
+        """The prefetched result if it answers this tool call, else None."""
+        if prefetch is None or not prefetch.matches(tool, arguments, self.threshold):
+            return None
+        prefetch.used = True
+        start = time.monotonic()
+        try:
+            result = prefetch.future.result(timeout=timeout)
+        except Exception:
+            metrics.PREFETCH.inc(result="failed")
+            return None
+        metrics.PREFETCH.inc(result="hit")
+        console.print(f"[dim]Using prefetched {prefetch.tool} result (waited {time.monotonic() - start:.2f}s)[/dim]")
+        return result
+
+    @staticmethod
+    def discard(prefetch: Optional[Prefetch]):
+        if prefetch is not None and not prefetch.used:
+            prefetch.future.cancel()
+            metrics.PREFETCH.inc(result="unused")
@@ -0,0 +1,40 @@
+import random
+import time
+from typing import Optional
+import httpx
+import openai
+
+class DeadlineExceeded(Exception):
+    """The request's time budget ran out."""
+
+class Deadline:
+    """A fixed point in time that every LLM and tool call in a request must respect."""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def timeout(self, cap: Optional[float] = None) -> float:
+        """Time left for the next call, capped at `cap`; raises once the budget is gone."""
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded(f"Deadline of {self.seconds:.1f}s exceeded")
+        return min(remaining, cap) if cap else remaining
+
+def is_transient(error: Exception) -> bool:
+    """Errors worth retrying: timeouts, dropped connections, rate limits and 5xx."""
+    if isinstance(error, (openai.APITimeoutError, openai.APIConnectionError, openai.RateLimitError,
+                          openai.InternalServerError, httpx.TimeoutException, httpx.TransportError)):
+        return True
+    status = getattr(error, "status_code", None)
+    return status is not None and (status == 429 or status >= 500)
+
+def backoff_delay(attempt: int, base: float = 0.25, cap: float = 4.0) -> float:
+    """Full-jitter exponential backoff, so retries from many sessions don't synchronize."""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
@@ -1,23 +1,40 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+from fastapi.responses import StreamingResponse, PlainTextResponse
+from starlette.background import BackgroundTask
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, AsyncIterator
 import uvicorn
 import asyncio
 import json
-import os
 import subprocess
+import time
+import uuid
 from main import Jarvis
+from brain import Brain
 from config import settings
 import system_stats
+import metrics
 from notifier import NotificationBridge
+from history_store import HistoryStore
+from fact_extractor import FactExtractor
+from skills.search_cache import get_search_cache
+from sessions import SessionPool
+from admission import AdmissionController, Overloaded, Ticket
 
-HISTORY_FILE = "conversation_history.json"
+history_store = HistoryStore(settings.HISTORY_LOG, legacy_file=settings.HISTORY_LEGACY_FILE)
 notif_bridge = NotificationBridge()
+stats_sampler = system_stats.StatsSampler(settings.STATS_SAMPLE_INTERVAL, settings.STATS_MAX_SAMPLES)
+admission = AdmissionController(settings.CHAT_MAX_CONCURRENCY, settings.CHAT_MAX_QUEUE, settings.CHAT_QUEUE_TIMEOUT)
 
 app = FastAPI(title="Jarvis Web API")
 
+metrics.REGISTRY.register(metrics.Gauge(
+    "jarvis_chat_active", "Chat requests currently holding a slot.", lambda: admission.active))
+metrics.REGISTRY.register(metrics.Gauge(
+    "jarvis_chat_queue_depth", "Chat requests waiting for a slot.", lambda: admission.waiting))
+
 # Enable CORS for frontend development
 app.add_middleware(
     CORSMiddleware,
@@ -34,21 +51,37 @@ app.add_middleware(
 class JarvisWrapper:
     def __init__(self):
         self.jarvis = Jarvis(voice_mode=False)  # We'll handle voice in the browser or via backend triggers
+        # Each browser session gets its own Brain; all of them share the pooled clients
+        brain = self.jarvis.brain
+        self.sessions = SessionPool(
+            lambda: Brain(client=brain.client, async_client=brain.async_client, memory=self.jarvis.memory),
+            max_sessions=settings.SESSION_MAX_ACTIVE,
+            session_dir=settings.SESSION_DIR
+        )
         
-    def get_response(self, text: str) -> str:
-        low_text = text.lower()
-        if "open" in low_text:
-            if "chrome" in low_text:
-                subprocess.Popen(["start", "chrome"], shell=True)
-                return "Opening Chrome for you, Sir."
-            elif "notepad" in low_text:
-                subprocess.Popen(["notepad.exe"])
-                return "Notepad is ready, Sir."
+    async def session(self, session_id: str):
+        """The in-memory session, or one restored from disk in a thread."""
+        return self.sessions.lookup(session_id) or await asyncio.to_thread(self.sessions.get, session_id)
         
-        return self.jarvis.brain.think(text, skills=self.jarvis.skills)
+    async def get_response(self, text: str, session_id: str) -> str:
+        session = await self.session(session_id)
+        async with session.lock:
+            return await session.brain.think_async(text, skills=self.jarvis.skills)
+
+    async def stream_response(self, text: str, session_id: str) -> AsyncIterator[str]:
+        session = await self.session(session_id)
+        async with session.lock:
+            async for delta in session.brain.think_stream_async(text, skills=self.jarvis.skills):
+                yield delta
 
 jarvis_ai = JarvisWrapper()
 
+metrics.REGISTRY.register(metrics.Gauge(
+    "jarvis_sessions_active", "Sessions held in memory.", lambda: len(jarvis_ai.sessions)))
+metrics.REGISTRY.register(metrics.Gauge(
+    "jarvis_conversation_bytes", "Approximate bytes of conversation held by in-memory sessions.",
+    jarvis_ai.sessions.conversation_bytes))
+
 class ChatRequest(BaseModel):
     message: str
 
@@ -57,23 +90,58 @@ class ChatResponse(BaseModel):
     action: Optional[str] = None
     status: str = "success"
 
+SESSION_COOKIE = "jarvis_session"
+
+def get_session_id(request: Request) -> str:
+    """Reuse the browser's session cookie, or start a new session."""
+    session_id = request.cookies.get(SESSION_COOKIE)
+    if session_id and SessionPool.valid_id(session_id):
+        return session_id
+    return uuid.uuid4().hex
+
+def set_session_cookie(response: Response, session_id: str):
+    response.set_cookie(SESSION_COOKIE, session_id, httponly=True, samesite="lax")
+
+async def admit() -> Ticket:
+    """Take a chat slot, turning overload into a fast 429/503 with Retry-After."""
+    try:
+        return await admission.acquire()
+    except Overloaded as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail, headers={"Retry-After": str(e.retry_after)})
+
+def detect_action(response: str) -> Optional[str]:
+    """Check a reply for sensor trigger keywords."""
+    low_res = response.lower()
+    if "visual scan" in low_res or "activating camera" in low_res:
+        return "open_camera"
+    elif "coordinates" in low_res or "gps" in low_res or "location" in low_res:
+        if "request" in low_res or "secure" in low_res:
+            return "request_location"
+    return None
+
 def load_history():
-    if os.path.exists(HISTORY_FILE):
-        try:
-            with open(HISTORY_FILE, "r") as f:
-                return json.load(f)
-        except:
-            return []
-    return []
+    return history_store.load()
 
 def save_to_history(sender: str, text: str):
-    history = load_history()
-    history.append({"sender": sender, "text": text})
-    with open(HISTORY_FILE, "w") as f:
-        json.dump(history, f, indent=4)
+    """Append and fsync one message; handlers run this in a thread to keep the event loop free."""
+    history_store.append(sender, text)
 
 @app.on_event("startup")
 async def startup_event():
+    asyncio.create_task(stats_sampler.run())
+    
+    # Move idle sessions out of memory
+    async def session_sweep_task():
+        while True:
+            await asyncio.sleep(60)
+            await asyncio.to_thread(jarvis_ai.sessions.evict_idle, settings.SESSION_IDLE_TIMEOUT)
+    asyncio.create_task(session_sweep_task())
+    
+    # Learn facts and preferences from the history log in the background
+    if settings.FACT_EXTRACTION_ENABLED:
+        extractor = FactExtractor(history_store, jarvis_ai.jarvis.memory, client=jarvis_ai.jarvis.brain.client)
+        asyncio.create_task(extractor.run())
+    
     if await notif_bridge.initialize():
         # Start background polling
         async def poll_task():
@@ -82,17 +150,59 @@ async def startup_event():
                 await asyncio.sleep(2)
         asyncio.create_task(poll_task())
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    jarvis_ai.sessions.flush()
+    jarvis_ai.jarvis.memory.close()
+    await jarvis_ai.jarvis.brain.async_client.close()
+
 @app.get("/api/notifications")
 async def get_notifications():
     return notif_bridge.get_latest()
 
 @app.get("/api/history")
-async def get_history():
-    return load_history()
+async def get_history(before: Optional[int] = None, since: Optional[int] = None, limit: int = 50):
+    """Page through history by message ID; `since` returns only newer messages."""
+    limit = max(1, min(limit, 200))
+    messages = history_store.page(before=before, since=since, limit=limit)
+    if since is not None:
+        has_more = bool(messages) and messages[-1]["id"] < len(history_store) - 1
+    else:
+        has_more = bool(messages) and messages[0]["id"] > 0
+    return {"messages": messages, "has_more": has_more}
+
+@app.get("/api/admission")
+async def get_admission_stats():
+    """Chat concurrency, queue depth and wait times, for sizing the deployment."""
+    return admission.stats()
+
+@app.get("/api/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus text exposition of latency histograms and counters."""
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/api/cache")
+async def get_cache_stats():
+    """Hit/miss counters for the LLM response cache, when enabled."""
+    cache = Brain._response_cache
+    return cache.stats() if cache else {"enabled": False}
+
+@app.get("/api/cache/search")
+async def get_search_cache_stats():
+    """Hit/miss counters for the shared search result cache, when enabled."""
+    cache = get_search_cache()
+    return cache.stats() if cache else {"enabled": False}
 
 @app.get("/api/system")
-async def get_system_stats():
-    return system_stats.get_system_stats()
+async def get_system_stats(window: Optional[str] = None):
+    """Latest background sample; `?window=60s` adds a series for sparklines."""
+    stats = dict(stats_sampler.latest())
+    if window:
+        seconds = system_stats.parse_window(window)
+        if seconds is None:
+            raise HTTPException(status_code=400, detail=f"Invalid window: {window}")
+        stats["series"] = stats_sampler.window(seconds)
+    return stats
 
 @app.post("/api/tools/open")
 async def open_app(request: dict):
@@ -107,29 +217,65 @@ async def open_app(request: dict):
         return {"status": "error", "message": str(e)}
 
 @app.post("/api/chat", response_model=ChatResponse)
-async def chat(request: ChatRequest):
+async def chat(request: ChatRequest, http_request: Request, http_response: Response):
+    session_id = get_session_id(http_request)
+    set_session_cookie(http_response, session_id)
+    start = time.perf_counter()
+    ticket = await admit()
     try:
         # Log user message
-        save_to_history("User", request.message)
+        await asyncio.to_thread(save_to_history, "User", request.message)
         
-        # Run the synchronous thinking process in a thread to avoid blocking FastAPI
-        response = await asyncio.to_thread(jarvis_ai.get_response, request.message)
+        response = await jarvis_ai.get_response(request.message, session_id)
         
         # Log Jarvis response
-        save_to_history("Jarvis", response)
+        await asyncio.to_thread(save_to_history, "Jarvis", response)
         
-        # Check for sensor trigger keywords
-        action = None
-        low_res = response.lower()
-        if "visual scan" in low_res or "activating camera" in low_res:
-            action = "open_camera"
-        elif "coordinates" in low_res or "gps" in low_res or "location" in low_res:
-            if "request" in low_res or "secure" in low_res:
-                action = "request_location"
-        
-        return {"response": response, "status": "success", "action": action}
+        return {"response": response, "status": "success", "action": detect_action(response)}
     except Exception as e:
+        metrics.ERRORS.inc(component="chat")
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        ticket.release()
+        metrics.REQUEST_LATENCY.observe(time.perf_counter() - start, endpoint="/api/chat")
+
+@app.post("/api/chat/stream")
+async def chat_stream(request: ChatRequest, http_request: Request):
+    """Server-Sent Events variant of /api/chat that pushes the reply token by token."""
+    session_id = get_session_id(http_request)
+    start = time.perf_counter()
+    ticket = await admit()
+    
+    async def events():
+        parts = []
+        try:
+            # Inside the try, so a failed write still releases the slot
+            await asyncio.to_thread(save_to_history, "User", request.message)
+            async for delta in jarvis_ai.stream_response(request.message, session_id):
+                parts.append(delta)
+                yield f"data: {json.dumps({'delta': delta})}\n\n"
+        except Exception as e:
+            metrics.ERRORS.inc(component="chat")
+            yield f"data: {json.dumps({'error': str(e)})}\n\n"
+            return
+        finally:
+            ticket.release()
+            metrics.REQUEST_LATENCY.observe(time.perf_counter() - start, endpoint="/api/chat/stream")
+        
+        response = "".join(parts)
+        await asyncio.to_thread(save_to_history, "Jarvis", response)
+        done = {"done": True, "response": response, "action": detect_action(response)}
+        yield f"data: {json.dumps(done)}\n\n"
+    
+    # The background task frees the slot even if the stream never starts
+    response = StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+        background=BackgroundTask(ticket.release)
+    )
+    set_session_cookie(response, session_id)
+    return response
 # Mount static files (must be after API routes)
 app.mount("/", StaticFiles(directory="ui", html=True), name="ui")
 
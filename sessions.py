@@ -0,0 +1,186 @@
+import asyncio
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from rich.console import Console
+from brain import Brain
+
+console = Console()
+
+SESSION_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+# (session id, conversation as dicts) detached from memory and waiting to be written
+Snapshot = Tuple[str, List[Dict]]
+
+class Session:
+    """Conversation state for one browser session."""
+
+    def __init__(self, session_id: str, brain: Brain):
+        self.id = session_id
+        self.brain = brain
+        # Serializes turns within a session; different sessions run in parallel
+        self.lock = asyncio.Lock()
+        self.last_used = time.time()
+
+class SessionPool:
+    """Bounded LRU pool of per-session Brains.
+
+    Sessions beyond `max_sessions`, or idle for too long, are written to
+    `session_dir` and dropped from memory; the next request for that
+    session restores its conversation from disk.
+    """
+
+    def __init__(self, brain_factory: Callable[[], Brain], max_sessions: int = 100, session_dir: str = "sessions"):
+        self.brain_factory = brain_factory
+        self.max_sessions = max_sessions
+        self.session_dir = Path(session_dir)
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        # Guards the dicts only; session files are written under _write_lock, outside it
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        # Snapshots of evicted sessions whose file is not written yet
+        self._pending: Dict[str, List[Dict]] = {}
+
+    @staticmethod
+    def valid_id(session_id: str) -> bool:
+        """Session IDs are uuid4 hex strings; anything else never touches disk."""
+        return bool(session_id) and bool(SESSION_ID_PATTERN.match(session_id))
+
+    def _path(self, session_id: str) -> Path:
+        return self.session_dir / f"{session_id}.json"
+
+    def lookup(self, session_id: str) -> Optional[Session]:
+        """The session if it is in memory, else None. Never touches disk, so it is safe on the event loop."""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._sessions.move_to_end(session_id)
+                session.last_used = time.time()
+            return session
+
+    def get(self, session_id: str) -> Session:
+        """Return the session, restoring it from disk or creating it if needed.
+
+        A miss reads and may write session files, so async callers try
+        lookup() first and run this in a thread.
+        """
+        if not self.valid_id(session_id):
+            raise ValueError(f"Invalid session id: {session_id!r}")
+        session = self.lookup(session_id)
+        if session is not None:
+            return session
+
+        history = self._restore(session_id)
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = Session(session_id, self.brain_factory())
+                session.brain.conversation_history.extend(history)
+                self._sessions[session_id] = session
+            self._sessions.move_to_end(session_id)
+            session.last_used = time.time()
+            snapshots = self._evict_overflow()
+        self._write(snapshots)
+        return session
+
+    def _restore(self, session_id: str) -> List:
+        with self._lock:
+            # Evicted but not written yet: the snapshot is newer than the file
+            pending = self._pending.get(session_id)
+        if pending is not None:
+            return pending
+        path = self._path(session_id)
+        if not path.exists():
+            return []
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            console.print(f"[yellow]Could not restore session {session_id}: {e}[/yellow]")
+            return []
+
+    def _persist(self, session_id: str, history: List[Dict]):
+        """Write a session's conversation to disk atomically."""
+        self.session_dir.mkdir(parents=True, exist_ok=True)
+        path = self._path(session_id)
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(history, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    def _detach(self, session_id: str) -> Optional[Snapshot]:
+        """Drop a session from memory, returning the snapshot to write. Caller holds the lock."""
+        session = self._sessions[session_id]
+        # A session mid-turn is still being mutated; leave it for the next pass
+        if session.lock.locked():
+            return None
+        history = session.brain.conversation_history.to_dicts()
+        del self._sessions[session_id]
+        self._pending[session_id] = history
+        return session_id, history
+
+    def _write(self, snapshots: List[Snapshot]):
+        """Write detached sessions to disk, outside the pool lock."""
+        for session_id, history in snapshots:
+            with self._write_lock:
+                with self._lock:
+                    # Evicted again since: the newer snapshot is written instead
+                    if self._pending.get(session_id) is not history:
+                        continue
+                try:
+                    self._persist(session_id, history)
+                except Exception as e:
+                    # The snapshot stays pending, so the session is restored from memory
+                    console.print(f"[red]Could not persist session {session_id}: {e}[/red]")
+                    continue
+                with self._lock:
+                    if self._pending.get(session_id) is history:
+                        del self._pending[session_id]
+
+    def _evict_overflow(self) -> List[Snapshot]:
+        snapshots = []
+        # Never evict the most recently used session, it is about to be handed out
+        for session_id in list(self._sessions)[:-1]:
+            if len(self._sessions) <= self.max_sessions:
+                break
+            snapshot = self._detach(session_id)
+            if snapshot is not None:
+                snapshots.append(snapshot)
+        return snapshots
+
+    def evict_idle(self, max_idle: float) -> int:
+        """Move sessions idle for more than `max_idle` seconds to disk."""
+        cutoff = time.time() - max_idle
+        with self._lock:
+            snapshots = [self._detach(session_id) for session_id, session in list(self._sessions.items())
+                         if session.last_used < cutoff]
+        snapshots = [snapshot for snapshot in snapshots if snapshot is not None]
+        self._write(snapshots)
+        return len(snapshots)
+
+    def flush(self):
+        """Persist every in-memory session, e.g. on shutdown."""
+        with self._lock:
+            snapshots = [(s.id, s.brain.conversation_history.to_dicts()) for s in self._sessions.values()]
+        with self._write_lock:
+            for session_id, history in snapshots:
+                self._persist(session_id, history)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "active": len(self._sessions),
+                "max": self.max_sessions,
+                "conversation_bytes": self.conversation_bytes()
+            }
+
+    def conversation_bytes(self) -> int:
+        """Approximate memory held by the conversations of in-memory sessions."""
+        return sum(s.brain.conversation_history.bytes for s in list(self._sessions.values()))
+
+    def __len__(self) -> int:
+        return len(self._sessions)
@@ -1,7 +1,21 @@
+import importlib
 from skills.base import BaseSkill
-from skills.time_skill import TimeSkill
-from skills.calculator_skill import CalculatorSkill
-from skills.web_search_skill import WebSearchSkill
-from skills.google_search_skill import GoogleSearchSkill
+from skills.registry import SkillRegistry, SkillSpec, tools_for
 
-__all__ = ['BaseSkill', 'TimeSkill', 'CalculatorSkill', 'WebSearchSkill', 'GoogleSearchSkill']
+# Skill classes are imported on first access, so `import skills` stays cheap
+_SKILL_MODULES = {
+    'TimeSkill': 'skills.time_skill',
+    'CalculatorSkill': 'skills.calculator_skill',
+    'WebSearchSkill': 'skills.web_search_skill',
+    'GoogleSearchSkill': 'skills.google_search_skill',
+    'AppLauncherSkill': 'skills.app_launcher_skill',
+    'FederatedSearchSkill': 'skills.federated_search_skill'
+}
+
+def __getattr__(name):
+    if name in _SKILL_MODULES:
+        return getattr(importlib.import_module(_SKILL_MODULES[name]), name)
+    raise AttributeError(f"module 'skills' has no attribute {name!r}")
+
+__all__ = ['BaseSkill', 'SkillRegistry', 'SkillSpec', 'tools_for', 'TimeSkill', 'CalculatorSkill',
+           'WebSearchSkill', 'GoogleSearchSkill', 'AppLauncherSkill', 'FederatedSearchSkill']
@@ -0,0 +1,40 @@
+from skills.base import BaseSkill
+import subprocess
+
+class AppLauncherSkill(BaseSkill):
+    """Opens desktop applications."""
+    
+    # app -> (command, needs shell, confirmation)
+    APPS = {
+        "chrome": (["start", "chrome"], True, "Opening Chrome for you, Sir."),
+        "notepad": (["notepad.exe"], False, "Notepad is ready, Sir.")
+    }
+    
+    @property
+    def name(self) -> str:
+        return "open_app"
+    
+    @property
+    def description(self) -> str:
+        return "Open a desktop application (chrome, notepad)"
+    
+    def execute(self, app: str) -> str:
+        """
+        Launch an application.
+        
+        Args:
+            app: Name of the application to open
+        
+        Returns:
+            Confirmation message
+        """
+        app = app.lower().strip()
+        if app not in self.APPS:
+            return f"Error: I don't know how to open {app}."
+        
+        command, shell, confirmation = self.APPS[app]
+        try:
+            subprocess.Popen(command, shell=shell)
+            return confirmation
+        except Exception as e:
+            return f"Error: Could not open {app} - {str(e)}"
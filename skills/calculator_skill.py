@@ -1,6 +1,36 @@
 from skills.base import BaseSkill
+import ast
+import operator
 import re
 
+OPERATORS = {
+    ast.Add: operator.add, ast.Sub: operator.sub, ast.Mult: operator.mul,
+    ast.Div: operator.truediv, ast.FloorDiv: operator.floordiv, ast.Mod: operator.mod, ast.Pow: operator.pow
+}
+UNARY_OPERATORS = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+# Limits that keep one expression from pinning the CPU (e.g. 9**9**8)
+MAX_EXPRESSION_CHARS = 200
+MAX_EXPONENT = 100
+MAX_MAGNITUDE = 10 ** 100
+
+def _evaluate(node):
+    """Evaluate a parsed arithmetic expression, refusing anything but numbers and operators."""
+    if isinstance(node, ast.Expression):
+        return _evaluate(node.body)
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        return node.value
+    if isinstance(node, ast.UnaryOp) and type(node.op) in UNARY_OPERATORS:
+        return UNARY_OPERATORS[type(node.op)](_evaluate(node.operand))
+    if isinstance(node, ast.BinOp) and type(node.op) in OPERATORS:
+        left, right = _evaluate(node.left), _evaluate(node.right)
+        if isinstance(node.op, ast.Pow) and (abs(right) > MAX_EXPONENT or abs(left) > MAX_MAGNITUDE):
+            raise ValueError("exponent too large")
+        result = OPERATORS[type(node.op)](left, right)
+        if isinstance(result, complex) or abs(result) > MAX_MAGNITUDE:
+            raise ValueError("result too large")
+        return result
+    raise ValueError("unsupported expression")
+
 class CalculatorSkill(BaseSkill):
     """Performs basic mathematical calculations."""
     
@@ -24,10 +54,12 @@ class CalculatorSkill(BaseSkill):
         """
         try:
             # Clean the expression - only allow numbers, operators, parentheses, and spaces
-            cleaned = re.sub(r'[^0-9+\-*/().\s]', '', expression)
+            cleaned = re.sub(r'[^0-9+\-*/%().\s]', '', expression)
+            if len(cleaned) > MAX_EXPRESSION_CHARS:
+                raise ValueError("expression too long")
             
             # Evaluate the expression safely
-            result = eval(cleaned, {"__builtins__": {}}, {})
+            result = _evaluate(ast.parse(cleaned, mode="eval"))
             
             return f"{expression} = {result}"
             
@@ -0,0 +1,119 @@
+from skills.base import BaseSkill
+from compaction import strip_tracking
+from config import settings
+from rich.console import Console
+from urllib.parse import urlsplit, urlunsplit
+from typing import Callable, Dict, List, Tuple
+import concurrent.futures
+import importlib
+import metrics
+
+console = Console()
+
+# provider -> (module, function returning title/body/href dicts); imported on first use
+PROVIDERS = {
+    "duckduckgo": ("skills.web_search_skill", "duckduckgo_results"),
+    "google": ("skills.google_search_skill", "google_results")
+}
+# Reciprocal rank fusion constant; larger values flatten the difference between ranks
+RRF_K = 60
+
+# Shared by every search, so a provider that outlives the deadline keeps running
+# (and fills the search cache) without holding up the answer
+_executor = concurrent.futures.ThreadPoolExecutor(max_workers=8, thread_name_prefix="federated-search")
+
+def canonical_url(url: str) -> str:
+    """One key for the same page reached via http/https, www., a trailing slash or tracking params."""
+    parts = urlsplit(strip_tracking(url.strip()))
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    return urlunsplit(("", host, parts.path.rstrip("/"), parts.query, ""))
+
+def merge_results(ranked_lists: List[Tuple[str, List[Dict]]], limit: int) -> List[Dict]:
+    """Merge per-provider result lists by canonical URL, ranked by reciprocal rank fusion.
+
+    Pages several providers agree on rise to the top. Each merged result
+    keeps the longest snippet and lists the providers that returned it.
+    """
+    merged: Dict[str, Dict] = {}
+    for provider, results in ranked_lists:
+        for rank, result in enumerate(results):
+            href = result.get("href") or ""
+            key = canonical_url(href) if href else (result.get("title") or "").lower()
+            if not key:
+                continue
+            entry = merged.get(key)
+            if entry is None:
+                entry = merged[key] = {"title": result.get("title") or "", "body": result.get("body") or "",
+                                       "href": strip_tracking(href) if href else "", "score": 0.0, "providers": []}
+            elif len(result.get("body") or "") > len(entry["body"]):
+                entry["body"] = result["body"]
+            entry["score"] += 1.0 / (RRF_K + rank + 1)
+            if provider not in entry["providers"]:
+                entry["providers"].append(provider)
+    return sorted(merged.values(), key=lambda e: e["score"], reverse=True)[:limit]
+
+def _provider(name: str) -> Callable[[str, int], List[Dict]]:
+    module, function = PROVIDERS[name]
+    return getattr(importlib.import_module(module), function)
+
+class FederatedSearchSkill(BaseSkill):
+    """Queries every configured search provider at once and merges the results."""
+
+    @property
+    def name(self) -> str:
+        return "search"
+
+    @property
+    def description(self) -> str:
+        return "Search the internet for real-time information, news, and facts across several search engines at once."
+
+    def execute(self, query: str, max_results: int = 8) -> str:
+        """
+        Search all configured providers in parallel.
+
+        Args:
+            query: The search query
+            max_results: Maximum number of merged results to return
+
+        Returns:
+            Merged results, best first, with the providers that answered
+        """
+        providers = [p.strip() for p in settings.SEARCH_PROVIDERS.split(",") if p.strip() in PROVIDERS]
+        if not providers:
+            return "No search providers are configured."
+
+        futures = {
+            _executor.submit(self._search, provider, query, max_results): provider
+            for provider in providers
+        }
+        _, pending = concurrent.futures.wait(futures, timeout=settings.SEARCH_DEADLINE)
+
+        # Walk providers in configured order so ties rank the same way every time
+        ranked_lists, notes = [], []
+        for future, provider in futures.items():
+            if future in pending:
+                notes.append(f"{provider} timed out")
+                continue
+            try:
+                ranked_lists.append((provider, future.result()))
+            except Exception as e:
+                notes.append(f"{provider} failed")
+                console.print(f"[yellow]{provider} search failed: {e}[/yellow]")
+
+        results = merge_results(ranked_lists, max_results)
+        if not results:
+            return f"No results found for '{query}'" + (f" ({', '.join(notes)})." if notes else ".")
+
+        formatted_results = []
+        for i, r in enumerate(results, 1):
+            formatted_results.append(f"{i}. {r['title']}\n   {r['body']}\n   URL: {r['href']}")
+        sources = ", ".join(name for name, _ in ranked_lists)
+        footer = f"Sources: {sources}" + (f" ({', '.join(notes)})" if notes else "")
+        return "\n\n".join(formatted_results) + "\n\n" + footer
+
+    @staticmethod
+    def _search(provider: str, query: str, max_results: int) -> List[Dict]:
+        with metrics.TOOL_LATENCY.time(tool=f"search:{provider}"):
+            return list(_provider(provider)(query, max_results))
@@ -1,7 +1,22 @@
 from skills.base import BaseSkill
+from skills.search_backend import use_search_backend, backend_search
+from skills.search_cache import cached_search
 from googlesearch import search
 import requests
 from bs4 import BeautifulSoup
+from typing import Dict, List
+
+def google_results(query: str, num_results: int = 5) -> List[Dict]:
+    """Google results as title/body/href dicts, through the search cache."""
+    def fetch():
+        if use_search_backend():
+            return backend_search("google", query, num_results)
+        # Performing the search
+        return [
+            {"title": url.title, "body": url.description, "href": url.url}
+            for url in search(query, num_results=num_results, advanced=True)
+        ]
+    return cached_search("google", query, num_results, fetch)
 
 class GoogleSearchSkill(BaseSkill):
     @property
@@ -13,21 +28,29 @@ class GoogleSearchSkill(BaseSkill):
         return "Search Google for real-time information, websites, and deep-dive facts."
 
     def execute(self, query: str, num_results: int = 5) -> str:
-        """Search Google and return simplified results."""
+        """Search Google and return simplified results.
+        
+        Args:
+            query: The search query
+            num_results: Number of results to return
+        """
         try:
             results = []
-            # Performing the search
-            for url in search(query, num_results=num_results, advanced=True):
-                snippet = url.description if url.description else "No description available."
-                results.append(f"Title: {url.title}\nSnippet: {snippet}\nLink: {url.url}")
+            for r in google_results(query, num_results):
+                snippet = r["body"] or "No description available."
+                results.append(f"Title: {r['title']}\nSnippet: {snippet}\nLink: {r['href']}")
             
-            if not results:
-                return f"I couldn't find any Google results for '{query}', Sir."
-                
-            return "\n\n---\n\n".join(results)
+            return self._format(query, results)
         except Exception as e:
             return f"An error occurred while accessing Google: {str(e)}"
 
+    @staticmethod
+    def _format(query: str, results: list) -> str:
+        if not results:
+            return f"I couldn't find any Google results for '{query}', Sir."
+            
+        return "\n\n---\n\n".join(results)
+
 if __name__ == "__main__":
     skill = GoogleSearchSkill()
     print(skill.execute("Latest news on Avengers Doomsday"))
@@ -0,0 +1,239 @@
+import ast
+import importlib
+import importlib.util
+import inspect
+import pkgutil
+import re
+import threading
+from collections.abc import Mapping
+from importlib.metadata import entry_points
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from rich.console import Console
+
+console = Console()
+
+# Third-party packages can add skills with an entry point such as
+#   [project.entry-points."jarvis.skills"]
+#   weather = "jarvis_weather:WeatherSkill"
+ENTRY_POINT_GROUP = "jarvis.skills"
+
+JSON_TYPES = {"str": "string", "int": "integer", "float": "number", "bool": "boolean"}
+ARG_LINE = re.compile(r"^\s*(\w+)(?:\s*\([^)]*\))?:\s*(.+)$")
+
+class SkillSpec(NamedTuple):
+    """What is known about a skill before its module is imported."""
+    name: str
+    description: str
+    module: str
+    class_name: str
+    # (argument, python type name, required, description) for execute()
+    arguments: Tuple[Tuple[str, str, bool, str], ...]
+
+    def tool(self) -> Dict:
+        """The skill as a tool definition for the chat completions API."""
+        return tool_definition(self.name, self.description, self.arguments)
+
+def tool_definition(name: str, description: str, arguments) -> Dict:
+    properties = {}
+    for arg, type_name, _, arg_description in arguments:
+        prop = {"type": JSON_TYPES.get(type_name, "string")}
+        if arg_description:
+            prop["description"] = arg_description
+        properties[arg] = prop
+    return {
+        "type": "function",
+        "function": {
+            "name": name,
+            "description": description,
+            "parameters": {
+                "type": "object",
+                "properties": properties,
+                "required": [arg for arg, _, required, _ in arguments if required]
+            }
+        }
+    }
+
+def _arg_descriptions(docstring: Optional[str]) -> Dict[str, str]:
+    """Descriptions from the "Args:" section of a Google-style docstring."""
+    descriptions: Dict[str, str] = {}
+    in_args = False
+    for line in (docstring or "").splitlines():
+        stripped = line.strip()
+        if stripped == "Args:":
+            in_args = True
+        elif in_args and stripped.endswith(":") and " " not in stripped:
+            break
+        elif in_args:
+            match = ARG_LINE.match(line)
+            if match:
+                descriptions[match.group(1)] = match.group(2).strip()
+    return descriptions
+
+def _returned_string(node: ast.AST) -> Optional[str]:
+    for stmt in getattr(node, "body", []):
+        if isinstance(stmt, ast.Return) and isinstance(stmt.value, ast.Constant) and isinstance(stmt.value.value, str):
+            return stmt.value.value
+    return None
+
+def _annotation_name(node: Optional[ast.AST]) -> str:
+    return node.id if isinstance(node, ast.Name) else "str"
+
+def _spec_from_class(node: ast.ClassDef, module: str) -> Optional[SkillSpec]:
+    """Read name, description and execute() arguments from a skill class's source."""
+    meta: Dict[str, Optional[str]] = {}
+    arguments: List[Tuple[str, str, bool, str]] = []
+    for item in node.body:
+        if isinstance(item, ast.FunctionDef) and item.name in ("name", "description"):
+            meta[item.name] = _returned_string(item)
+        elif isinstance(item, ast.Assign) and len(item.targets) == 1 and isinstance(item.targets[0], ast.Name) \
+                and item.targets[0].id in ("name", "description") and isinstance(item.value, ast.Constant):
+            meta[item.targets[0].id] = item.value.value
+        elif isinstance(item, ast.FunctionDef) and item.name == "execute":
+            args = item.args.args[1:]
+            first_default = len(args) - len(item.args.defaults)
+            descriptions = _arg_descriptions(ast.get_docstring(item))
+            arguments = [
+                (arg.arg, _annotation_name(arg.annotation), i < first_default, descriptions.get(arg.arg, ""))
+                for i, arg in enumerate(args)
+            ]
+    if not meta.get("name") or meta.get("description") is None:
+        return None
+    return SkillSpec(meta["name"], meta["description"], module, node.name, tuple(arguments))
+
+def _spec_from_instance(skill, module: str = "", class_name: str = "") -> SkillSpec:
+    """The same metadata read from a skill object, for skills whose source can't be parsed."""
+    arguments = []
+    execute = skill.execute
+    descriptions = _arg_descriptions(inspect.getdoc(execute))
+    for param in inspect.signature(execute).parameters.values():
+        if param.kind in (param.VAR_POSITIONAL, param.VAR_KEYWORD):
+            continue
+        type_name = getattr(param.annotation, "__name__", "str")
+        arguments.append((param.name, type_name, param.default is param.empty, descriptions.get(param.name, "")))
+    return SkillSpec(skill.name, skill.description, module or type(skill).__module__,
+                     class_name or type(skill).__name__, tuple(arguments))
+
+def _scan_source(path: str, module: str, class_name: Optional[str] = None) -> List[SkillSpec]:
+    try:
+        tree = ast.parse(Path(path).read_text(encoding="utf-8"))
+    except (OSError, SyntaxError) as e:
+        console.print(f"[yellow]Could not read skill module {module}: {e}[/yellow]")
+        return []
+    specs = []
+    for node in tree.body:
+        if not isinstance(node, ast.ClassDef):
+            continue
+        if class_name is not None:
+            if node.name != class_name:
+                continue
+        elif not any(isinstance(base, ast.Name) and base.id == "BaseSkill" for base in node.bases):
+            continue
+        spec = _spec_from_class(node, module)
+        if spec is not None:
+            specs.append(spec)
+    return specs
+
+class SkillRegistry(Mapping):
+    """Skills by tool name, imported and instantiated on first use.
+
+    discover() finds skills in the `skills` package and in the
+    "jarvis.skills" entry point group by reading their source, so startup
+    never imports a skill's dependencies. Looking a skill up
+    (registry["web_search"]) imports its module and creates the instance
+    once. tools() builds the tool definitions Brain sends to the model
+    from the same metadata.
+    """
+
+    def __init__(self, specs: Optional[List[SkillSpec]] = None):
+        self._specs: Dict[str, SkillSpec] = {}
+        self._instances: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        for spec in specs or []:
+            self.add_spec(spec)
+
+    @classmethod
+    def discover(cls, package: str = "skills", group: str = ENTRY_POINT_GROUP,
+                 exclude: Iterable[str] = ()) -> "SkillRegistry":
+        """Find every skill, leaving out those named in `exclude`."""
+        registry = cls()
+        package_spec = importlib.util.find_spec(package)
+        for info in pkgutil.iter_modules(package_spec.submodule_search_locations or []):
+            if info.name in ("base", "registry") or info.ispkg:
+                continue
+            path = Path(info.module_finder.path) / f"{info.name}.py"
+            for spec in _scan_source(str(path), f"{package}.{info.name}"):
+                registry.add_spec(spec)
+        for entry_point in entry_points(group=group):
+            registry._add_entry_point(entry_point)
+        for name in exclude:
+            registry._specs.pop(name.strip(), None)
+            registry._instances.pop(name.strip(), None)
+        return registry
+
+    def _add_entry_point(self, entry_point):
+        module, _, class_name = entry_point.value.partition(":")
+        try:
+            module_spec = importlib.util.find_spec(module)
+            specs = _scan_source(module_spec.origin, module, class_name) if module_spec and module_spec.origin else []
+            if not specs:
+                # Metadata computed at runtime: import the plugin to read it
+                skill = entry_point.load()()
+                specs = [_spec_from_instance(skill, module, class_name)]
+                self._instances[skill.name] = skill
+        except Exception as e:
+            console.print(f"[yellow]Could not load skill plugin {entry_point.name}: {e}[/yellow]")
+            return
+        for spec in specs:
+            self.add_spec(spec)
+
+    def add_spec(self, spec: SkillSpec):
+        if spec.name in self._specs:
+            console.print(f"[yellow]Skill {spec.name} from {spec.module} replaces {self._specs[spec.name].module}.[/yellow]")
+            self._instances.pop(spec.name, None)
+        self._specs[spec.name] = spec
+
+    def add(self, skill):
+        """Register an already created skill object."""
+        spec = _spec_from_instance(skill)
+        self.add_spec(spec)
+        self._instances[spec.name] = skill
+
+    def __getitem__(self, name: str):
+        skill = self._instances.get(name)
+        if skill is not None:
+            return skill
+        spec = self._specs[name]
+        with self._lock:
+            skill = self._instances.get(name)
+            if skill is None:
+                skill = getattr(importlib.import_module(spec.module), spec.class_name)()
+                self._instances[name] = skill
+        return skill
+
+    def __contains__(self, name) -> bool:
+        return name in self._specs
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._specs)
+
+    def __len__(self) -> int:
+        return len(self._specs)
+
+    def spec(self, name: str) -> SkillSpec:
+        return self._specs[name]
+
+    def loaded(self) -> List[str]:
+        """Names of the skills imported so far."""
+        return list(self._instances)
+
+    def tools(self) -> List[Dict]:
+        return [spec.tool() for spec in self._specs.values()]
+
+def tools_for(skills) -> List[Dict]:
+    """Tool definitions for a SkillRegistry or a plain {name: skill} dict."""
+    if skills is None:
+        return []
+    if isinstance(skills, SkillRegistry):
+        return skills.tools()
+    return [_spec_from_instance(skill).tool() for skill in skills.values()]
@@ -0,0 +1,17 @@
+import requests
+from typing import Dict, List
+from config import settings
+
+def use_search_backend() -> bool:
+    """True when SEARCH_BASE_URL points the search skills at stub_server.py."""
+    return bool(settings.SEARCH_BASE_URL)
+
+def backend_search(engine: str, query: str, max_results: int) -> List[Dict]:
+    """Results from the configured search backend as title/body/href dicts."""
+    response = requests.get(
+        f"{settings.SEARCH_BASE_URL.rstrip('/')}/search",
+        params={"engine": engine, "q": query, "max_results": max_results},
+        timeout=settings.TOOL_TIMEOUT
+    )
+    response.raise_for_status()
+    return response.json()["results"]
@@ -0,0 +1,151 @@
+import concurrent.futures
+import math
+import re
+import threading
+from typing import Callable, Dict, List, Optional
+from rich.console import Console
+from cache import TTLCache
+from config import settings
+
+console = Console()
+
+def normalize_query(query: str) -> str:
+    """"Weather in  Paris?" and "weather in paris" are the same search."""
+    query = re.sub(r"\s+", " ", query.lower()).strip()
+    return query.strip("?!.,;: ")
+
+def parse_ttls(spec: str) -> Dict[str, float]:
+    """Parse "duckduckgo=600,google=1800.5" into per-provider TTLs in seconds."""
+    ttls = {}
+    for entry in filter(None, (e.strip() for e in spec.split(","))):
+        name, _, seconds = entry.partition("=")
+        try:
+            ttl = float(seconds)
+        except ValueError:
+            ttl = None
+        if not name.strip() or ttl is None or not math.isfinite(ttl) or ttl <= 0:
+            console.print(f"[yellow]Ignoring search cache TTL {entry!r}: expected provider=seconds[/yellow]")
+            continue
+        ttls[name.strip()] = ttl
+    return ttls
+
+class SearchCache:
+    """Shared cache of raw search results for the search skills.
+
+    Results (lists of title/body/href dicts) are keyed on provider, result
+    count and the normalized query, and expire after the provider's TTL.
+    An expired entry is still served for up to `max_stale` seconds while
+    one background refresh fetches a new copy. Concurrent misses for the
+    same key wait for a single fetch instead of each hitting the provider.
+    """
+
+    def __init__(self, ttls: Optional[Dict[str, float]] = None, default_ttl: float = 900,
+                 max_entries: int = 256, disk_path: Optional[str] = None, disk_max_entries: int = 5000,
+                 max_stale: float = 3600):
+        self.ttls = ttls or {}
+        self.default_ttl = default_ttl
+        self.cache = TTLCache("search", max_entries=max_entries, ttl=default_ttl, disk_path=disk_path,
+                              disk_max_entries=disk_max_entries, max_stale=max_stale)
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=2, thread_name_prefix="search-refresh")
+        self._inflight: Dict[str, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+        self.stale_served = 0
+        self.refreshes = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def key(provider: str, query: str, max_results: int) -> str:
+        return f"{provider}:{max_results}:{normalize_query(query)}"
+
+    def ttl(self, provider: str) -> float:
+        return self.ttls.get(provider, self.default_ttl)
+
+    def search(self, provider: str, query: str, max_results: int, fetch: Callable[[], List[Dict]]) -> List[Dict]:
+        """Cached results for this search, calling `fetch` only when needed."""
+        key = self.key(provider, query, max_results)
+        found = self.cache.get_with_age(key)
+        if found is not None:
+            results, _, fresh = found
+            if not fresh:
+                self.stale_served += 1
+                self._refresh(provider, key, fetch)
+            return results
+        return self._fetch(provider, key, fetch).result()
+
+    def _fetch(self, provider: str, key: str, fetch: Callable[[], List[Dict]],
+               background: bool = False) -> concurrent.futures.Future:
+        """Start (or join) the one fetch for `key`."""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                if not background:
+                    self.coalesced += 1
+                return future
+            future = concurrent.futures.Future()
+            self._inflight[key] = future
+            # Only refreshes that start a fetch count, not ones joining a fetch in flight
+            if background:
+                self.refreshes += 1
+        if background:
+            self._executor.submit(self._run, provider, key, fetch, future)
+        else:
+            self._run(provider, key, fetch, future)
+        return future
+
+    def _run(self, provider: str, key: str, fetch: Callable[[], List[Dict]], future: concurrent.futures.Future):
+        try:
+            results = list(fetch())
+            # Empty result lists are usually a provider hiccup, so they are not kept
+            if results:
+                self.cache.set(key, results, ttl=self.ttl(provider))
+            future.set_result(results)
+        except Exception as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _refresh(self, provider: str, key: str, fetch: Callable[[], List[Dict]]):
+        with self._lock:
+            if key in self._inflight:
+                return
+        self._fetch(provider, key, fetch, background=True).add_done_callback(self._report_refresh)
+
+    @staticmethod
+    def _report_refresh(future: concurrent.futures.Future):
+        if future.exception() is not None:
+            console.print(f"[yellow]Could not refresh cached search: {future.exception()}[/yellow]")
+
+    def clear(self):
+        self.cache.clear()
+
+    def stats(self) -> Dict:
+        return dict(self.cache.stats(), stale_served=self.stale_served, refreshes=self.refreshes,
+                    coalesced=self.coalesced, ttls=dict(self.ttls, default=self.default_ttl))
+
+_search_cache: Optional[SearchCache] = None
+_search_cache_lock = threading.Lock()
+
+def get_search_cache() -> Optional[SearchCache]:
+    """The process-wide SearchCache, or None when SEARCH_CACHE_ENABLED is off."""
+    global _search_cache
+    if not settings.SEARCH_CACHE_ENABLED:
+        return None
+    with _search_cache_lock:
+        if _search_cache is None:
+            _search_cache = SearchCache(
+                ttls=parse_ttls(settings.SEARCH_CACHE_TTLS),
+                default_ttl=settings.SEARCH_CACHE_TTL,
+                max_entries=settings.SEARCH_CACHE_MAX_ENTRIES,
+                disk_path=settings.SEARCH_CACHE_DISK_PATH or None,
+                disk_max_entries=settings.SEARCH_CACHE_DISK_MAX_ENTRIES,
+                max_stale=settings.SEARCH_CACHE_MAX_STALE
+            )
+        return _search_cache
+
+def cached_search(provider: str, query: str, max_results: int, fetch: Callable[[], List[Dict]]) -> List[Dict]:
+    """Run `fetch` through the shared search cache when it is enabled."""
+    cache = get_search_cache()
+    if cache is None:
+        return list(fetch())
+    return cache.search(provider, query, max_results, fetch)
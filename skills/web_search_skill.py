@@ -1,6 +1,18 @@
 from skills.base import BaseSkill
+from skills.search_backend import use_search_backend, backend_search
+from skills.search_cache import cached_search
 from duckduckgo_search import DDGS
 import json
+from typing import Dict, List
+
+def duckduckgo_results(query: str, max_results: int = 5) -> List[Dict]:
+    """DuckDuckGo results as title/body/href dicts, through the search cache."""
+    def fetch():
+        if use_search_backend():
+            return backend_search("duckduckgo", query, max_results)
+        with DDGS() as ddgs:
+            return ddgs.text(query, max_results=max_results)
+    return cached_search("duckduckgo", query, max_results, fetch)
 
 class WebSearchSkill(BaseSkill):
     @property
@@ -12,18 +24,22 @@ class WebSearchSkill(BaseSkill):
         return "Search the internet for real-time information, news, and facts."
 
     def execute(self, query: str, max_results: int = 5) -> str:
-        """Search the web for the given query."""
+        """Search the web for the given query.
+        
+        Args:
+            query: The search query
+            max_results: Maximum number of results to return
+        """
         try:
-            with DDGS() as ddgs:
-                results = ddgs.text(query, max_results=max_results)
-                if not results:
-                    return f"No results found for '{query}'."
-                
-                formatted_results = []
-                for i, r in enumerate(results, 1):
-                    formatted_results.append(f"{i}. {r['title']}\n   {r['body']}\n   URL: {r['href']}")
-                
-                return "\n\n".join(formatted_results)
+            results = duckduckgo_results(query, max_results)
+            if not results:
+                return f"No results found for '{query}'."
+            
+            formatted_results = []
+            for i, r in enumerate(results, 1):
+                formatted_results.append(f"{i}. {r['title']}\n   {r['body']}\n   URL: {r['href']}")
+            
+            return "\n\n".join(formatted_results)
         except Exception as e:
             return f"An error occurred while searching: {str(e)}"
 
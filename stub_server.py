@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Record/replay stand-in for the OpenAI chat API and the search providers.
+
+Point Jarvis at it with LLM_BASE_URL=http://127.0.0.1:8100/v1 and
+SEARCH_BASE_URL=http://127.0.0.1:8100, then run:
+
+    STUB_MODE=record python stub_server.py   # proxy to the real services and save transcripts
+    STUB_MODE=replay python stub_server.py   # answer from the transcript file, fully offline
+
+Latency, streaming token rate and error rate are injected from settings
+(STUB_LATENCY, STUB_TOKENS_PER_SEC, STUB_ERROR_RATE, ...).
+"""
+
+import asyncio
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from rich.console import Console
+from config import settings
+
+console = Console()
+
+def _key(kind: str, payload: Any) -> str:
+    return hashlib.sha256(json.dumps([kind, payload], sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+def llm_key(body: Dict) -> str:
+    """Requests match on messages, tools and temperature; the model is left
+    out so a transcript replays whatever model or fallback asks for it."""
+    return _key("llm", {k: body.get(k) for k in ("messages", "tools", "temperature")})
+
+def search_key(engine: str, query: str, max_results: int) -> str:
+    return _key("search", {"engine": engine, "query": query.strip().lower(), "max_results": max_results})
+
+class Transcript:
+    """Recorded request/response pairs in a JSONL file, indexed by request key."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.entries: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.entries[entry["key"]] = entry["response"]
+            console.print(f"[dim]Loaded {len(self.entries)} recorded exchanges from {self.path}[/dim]")
+
+    def get(self, key: str) -> Optional[Dict]:
+        return self.entries.get(key)
+
+    def record(self, kind: str, key: str, request: Any, response: Any):
+        with self._lock:
+            self.entries[key] = response
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({"kind": kind, "key": key, "request": request, "response": response},
+                                   ensure_ascii=False) + "\n")
+
+class Faults:
+    """Latency, token pacing and error injection, seeded for repeatable runs."""
+
+    def __init__(self):
+        self.latency = settings.STUB_LATENCY
+        self.jitter = settings.STUB_LATENCY_JITTER
+        self.tokens_per_sec = settings.STUB_TOKENS_PER_SEC
+        self.error_rate = settings.STUB_ERROR_RATE
+        self.error_status = settings.STUB_ERROR_STATUS
+        self.random = random.Random(settings.STUB_SEED)
+
+    async def delay(self, scale: float = 1.0):
+        seconds = (self.latency + self.random.uniform(0, self.jitter)) * scale
+        if seconds > 0:
+            await asyncio.sleep(seconds)
+
+    def error(self) -> Optional[JSONResponse]:
+        if self.error_rate and self.random.random() < self.error_rate:
+            return JSONResponse(
+                {"error": {"message": "Injected stub failure", "type": "server_error", "code": self.error_status}},
+                status_code=self.error_status
+            )
+        return None
+
+    async def pace(self, tokens: int):
+        if self.tokens_per_sec > 0 and tokens:
+            await asyncio.sleep(tokens / self.tokens_per_sec)
+
+transcript = Transcript(settings.STUB_TRANSCRIPT)
+faults = Faults()
+app = FastAPI(title="Jarvis LLM/Search Stub")
+
+def _tokens(text: str) -> List[str]:
+    """Rough token pieces for pacing a streamed answer."""
+    return re.findall(r"\S+\s*|\s+", text or "")
+
+def _canned_message(body: Dict) -> Dict:
+    """Deterministic answer for a request that was never recorded."""
+    last_user = next((m.get("content") or "" for m in reversed(body.get("messages", [])) if m.get("role") == "user"), "")
+    return {"role": "assistant", "content": f"Stub reply to: {last_user[:200]}"}
+
+def _completion(message: Dict, model: str) -> Dict:
+    content_tokens = len(_tokens(message.get("content") or ""))
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "message": message,
+            "finish_reason": "tool_calls" if message.get("tool_calls") else "stop"
+        }],
+        "usage": {"prompt_tokens": 0, "completion_tokens": content_tokens, "total_tokens": content_tokens}
+    }
+
+async def _stream(message: Dict, model: str):
+    chunk_id = f"chatcmpl-{uuid.uuid4().hex}"
+
+    def chunk(delta: Dict, finish_reason: Optional[str] = None) -> str:
+        data = {
+            "id": chunk_id, "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]
+        }
+        return f"data: {json.dumps(data)}\n\n"
+
+    yield chunk({"role": "assistant", "content": ""})
+    if message.get("tool_calls"):
+        tool_calls = [dict(tc, index=i) for i, tc in enumerate(message["tool_calls"])]
+        await faults.pace(sum(len(_tokens(tc["function"].get("arguments", ""))) for tc in tool_calls))
+        yield chunk({"tool_calls": tool_calls})
+        yield chunk({}, "tool_calls")
+    else:
+        for piece in _tokens(message.get("content") or ""):
+            await faults.pace(1)
+            yield chunk({"content": piece})
+        yield chunk({}, "stop")
+    yield "data: [DONE]\n\n"
+
+async def _record_completion(request: Request, body: Dict) -> Dict:
+    """Forward to the real API (never streamed, so the answer can be stored whole)."""
+    upstream = dict(body, stream=False)
+    upstream.pop("stream_options", None)
+    headers = {"Authorization": request.headers.get("authorization", f"Bearer {settings.OPENAI_API_KEY}")}
+    async with httpx.AsyncClient(timeout=settings.STUB_UPSTREAM_TIMEOUT) as client:
+        response = await client.post(f"{settings.STUB_UPSTREAM_URL}/chat/completions", json=upstream, headers=headers)
+        response.raise_for_status()
+    message = response.json()["choices"][0]["message"]
+    message = {k: v for k, v in message.items() if v is not None}
+    transcript.record("llm", llm_key(body), body, message)
+    return message
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    model = body.get("model", "stub")
+    error = faults.error()
+    if error:
+        return error
+    await faults.delay()
+
+    message = transcript.get(llm_key(body))
+    if message is None:
+        if settings.STUB_MODE == "record":
+            try:
+                message = await _record_completion(request, body)
+            except httpx.HTTPStatusError as e:
+                return JSONResponse(e.response.json(), status_code=e.response.status_code)
+        else:
+            message = _canned_message(body)
+
+    if body.get("stream"):
+        return StreamingResponse(_stream(message, model), media_type="text/event-stream")
+    await faults.pace(len(_tokens(message.get("content") or "")))
+    return _completion(message, model)
+
+def _live_search(engine: str, query: str, max_results: int) -> List[Dict]:
+    if engine == "google":
+        from googlesearch import search
+        return [{"title": r.title, "body": r.description, "href": r.url}
+                for r in search(query, num_results=max_results, advanced=True)]
+    from duckduckgo_search import DDGS
+    with DDGS() as ddgs:
+        return [{"title": r["title"], "body": r["body"], "href": r["href"]}
+                for r in ddgs.text(query, max_results=max_results) or []]
+
+def _canned_results(query: str, max_results: int) -> List[Dict]:
+    slug = re.sub(r"\W+", "-", query.lower()).strip("-") or "query"
+    return [
+        {"title": f"Result {i} for {query}", "body": f"Stub snippet {i} about {query}.",
+         "href": f"https://example.com/{slug}/{i}"}
+        for i in range(1, max_results + 1)
+    ]
+
+@app.get("/search")
+async def search(q: str, engine: str = "duckduckgo", max_results: int = 5):
+    error = faults.error()
+    if error:
+        return error
+    await faults.delay(settings.STUB_SEARCH_LATENCY_SCALE)
+
+    key = search_key(engine, q, max_results)
+    results = transcript.get(key)
+    if results is None:
+        if settings.STUB_MODE == "record":
+            results = await asyncio.to_thread(_live_search, engine, q, max_results)
+            transcript.record("search", key, {"engine": engine, "q": q, "max_results": max_results}, results)
+        else:
+            results = _canned_results(q, max_results)
+    return {"results": results}
+
+@app.get("/stats")
+async def stats():
+    return {"mode": settings.STUB_MODE, "recorded": len(transcript.entries)}
+
+if __name__ == "__main__":
+    console.print(f"[dim]Stub server in {settings.STUB_MODE} mode on port {settings.STUB_PORT}[/dim]")
+    uvicorn.run(app, host="127.0.0.1", port=settings.STUB_PORT)
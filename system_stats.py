@@ -1,5 +1,8 @@
 import psutil
 import time
+import asyncio
+from collections import deque
+from typing import Dict, List, Optional
 
 def get_system_stats():
     try:
@@ -20,5 +23,69 @@ def get_system_stats():
     except Exception as e:
         return {"error": str(e)}
 
+class StatsSampler:
+    """Samples CPU/RAM/battery in the background into a fixed-size ring buffer.
+    
+    cpu_percent(interval=None) measures usage since the previous call, so
+    sampling on a timer gives the same numbers as interval=1 without ever
+    sleeping inside a request.
+    """
+    
+    def __init__(self, interval: float = 1.0, max_samples: int = 300):
+        self.interval = interval
+        self.samples = deque(maxlen=max_samples)
+        psutil.cpu_percent(interval=None)  # Prime the CPU counter
+        
+    def sample(self) -> Dict:
+        """Take one non-blocking sample and add it to the buffer."""
+        try:
+            cpu_usage = psutil.cpu_percent(interval=None)
+            ram_usage = psutil.virtual_memory().percent
+            battery = psutil.sensors_battery()
+            battery_usage = battery.percent if battery else 100
+        except Exception as e:
+            return {"error": str(e)}
+        
+        stats = {
+            "time": time.time(),
+            "cpu": cpu_usage,
+            "ram": ram_usage,
+            "battery": battery_usage,
+            "status": "Optimal" if cpu_usage < 80 else "Overloaded"
+        }
+        self.samples.append(stats)
+        return stats
+    
+    async def run(self):
+        """Sample forever; meant to be started as a background task."""
+        while True:
+            await asyncio.to_thread(self.sample)
+            await asyncio.sleep(self.interval)
+    
+    def latest(self) -> Dict:
+        """Most recent sample, taken on demand if the sampler hasn't run yet."""
+        if self.samples:
+            return self.samples[-1]
+        return self.sample()
+    
+    def window(self, seconds: float) -> List[Dict]:
+        """Samples from the last `seconds`, oldest first."""
+        cutoff = time.time() - seconds
+        # sample() appends from a worker thread; copy before iterating
+        return [s for s in list(self.samples) if s["time"] >= cutoff]
+
+def parse_window(value: str) -> Optional[float]:
+    """Parse a window like '60s', '5m' or '90' into seconds; None if it isn't a positive duration."""
+    units = {"s": 1, "m": 60, "h": 3600}
+    value = value.strip().lower()
+    try:
+        if value and value[-1] in units:
+            seconds = float(value[:-1]) * units[value[-1]]
+        else:
+            seconds = float(value)
+    except ValueError:
+        return None
+    return seconds if 0 < seconds < float("inf") else None
+
 if __name__ == "__main__":
     print(get_system_stats())
@@ -8,9 +8,12 @@ const closeHistory = document.getElementById('close-history');
 const historyContent = document.getElementById('history-content');
 
 const API_BASE_URL = `${window.location.protocol}//${window.location.hostname}:8000/api`;
-let conversationHistory = []; // Stores the full session history
+let conversationHistory = []; // Loaded window of the server-side history, oldest first
+let historyHasMore = false;
+let historyLoading = false;
+const HISTORY_PAGE_SIZE = 50;
 
-function addMessage(text, saveToHistory = true) {
+function showHudMessage(text) {
     // Show on HUD (Temporary)
     const msgDiv = document.createElement('div');
     msgDiv.className = 'jarvis-msg';
@@ -18,14 +21,12 @@ function addMessage(text, saveToHistory = true) {
     chatOutput.appendChild(msgDiv);
     vibratePhone(50);
 
-    // Save to permanent Archive
-    if (saveToHistory) {
-        addToHistory('Jarvis', text);
-    }
-
     // Auto-scroll to latest message if needed
     chatOutput.scrollTop = chatOutput.scrollHeight;
+    return msgDiv;
+}
 
+function fadeHudMessage(msgDiv) {
     // Fade out and remove after 10 seconds to keep HUD clean
     setTimeout(() => {
         msgDiv.style.opacity = '0';
@@ -35,21 +36,51 @@ function addMessage(text, saveToHistory = true) {
     }, 10000);
 }
 
+function addMessage(text, saveToHistory = true) {
+    const msgDiv = showHudMessage(text);
+
+    // Pull the newly archived messages from the server
+    if (saveToHistory) {
+        syncHistory();
+    }
+
+    fadeHudMessage(msgDiv);
+}
+
+// Read a text/event-stream response and hand each JSON event to onEvent
+async function readEventStream(response, onEvent) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+        const { value, done } = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, { stream: true });
+
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const rawEvent = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+            rawEvent.split('\n')
+                .filter(line => line.startsWith('data: '))
+                .forEach(line => onEvent(JSON.parse(line.slice(6))));
+        }
+    }
+}
+
 async function handleCommand(text) {
     if (!text) return;
 
     // Clear input field immediately
     userInput.value = '';
 
-    // Save user message to history
-    addToHistory('User', text);
-
     // Add thinking animation
     const reactor = document.querySelector('.arc-reactor');
     if (reactor) reactor.classList.add('thinking');
 
     try {
-        const response = await fetch(`${API_BASE_URL}/chat`, {
+        const response = await fetch(`${API_BASE_URL}/chat/stream`, {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
@@ -57,40 +88,114 @@ async function handleCommand(text) {
             body: JSON.stringify({ message: text }),
         });
 
-        if (!response.ok) throw new Error('Network response was not ok');
+        if (response.status === 429 || response.status === 503) {
+            if (reactor) reactor.classList.remove('thinking');
+            const retryAfter = response.headers.get('Retry-After') || 'a few';
+            addMessage(`Sir, my core is at capacity. Please try again in ${retryAfter} seconds.`, false);
+            return;
+        }
+        if (!response.ok || !response.body) throw new Error('Network response was not ok');
+
+        // Render tokens as they arrive instead of waiting for the full reply
+        let msgDiv = null;
+        let result = null;
+        await readEventStream(response, (event) => {
+            if (event.error) throw new Error(event.error);
+            if (event.delta) {
+                if (!msgDiv) {
+                    if (reactor) reactor.classList.remove('thinking');
+                    msgDiv = showHudMessage('');
+                }
+                msgDiv.textContent += event.delta;
+                chatOutput.scrollTop = chatOutput.scrollHeight;
+            }
+            if (event.done) result = event;
+        });
 
-        const data = await response.json();
-        reactor.classList.remove('thinking');
-        addMessage(data.response); // This also saves to history
-        speak(data.response);
+        if (reactor) reactor.classList.remove('thinking');
+        if (!result) throw new Error('Stream ended early');
+        if (!msgDiv) msgDiv = showHudMessage(result.response);
+        fadeHudMessage(msgDiv);
+        syncHistory();
+        speak(result.response);
 
         // Handle Server-Side Actions (for AI triggers)
-        if (data.action === "open_camera") openCamera();
-        if (data.action === "request_location") requestLocation();
+        if (result.action === "open_camera") openCamera();
+        if (result.action === "request_location") requestLocation();
 
     } catch (error) {
-        reactor.classList.remove('thinking');
+        if (reactor) reactor.classList.remove('thinking');
         console.error('Error:', error);
         addMessage("Sir, connection to core is unstable.", false);
     }
 }
 
-function addToHistory(sender, text) {
-    conversationHistory.push({ sender, text, timestamp: new Date().toLocaleTimeString() });
-    renderHistory();
+function createHistoryItem(item) {
+    const itemDiv = document.createElement('div');
+    itemDiv.className = `hist-item ${item.sender === 'User' ? 'hist-user' : 'hist-jarvis'}`;
+    itemDiv.innerHTML = `<strong>${item.sender}:</strong> ${item.text}`;
+    return itemDiv;
 }
 
-function renderHistory() {
+// Load the most recent page; older pages are fetched on scroll
+async function loadLatestHistory() {
+    const response = await fetch(`${API_BASE_URL}/history?limit=${HISTORY_PAGE_SIZE}`);
+    if (!response.ok) return;
+    const page = await response.json();
+    conversationHistory = page.messages;
+    historyHasMore = page.has_more;
+
+    const fragment = document.createDocumentFragment();
+    conversationHistory.forEach(item => fragment.appendChild(createHistoryItem(item)));
     historyContent.innerHTML = '';
-    conversationHistory.forEach(item => {
-        const itemDiv = document.createElement('div');
-        itemDiv.className = `hist-item ${item.sender === 'User' ? 'hist-user' : 'hist-jarvis'}`;
-        itemDiv.innerHTML = `<strong>${item.sender}:</strong> ${item.text}`;
-        historyContent.appendChild(itemDiv);
-    });
+    historyContent.appendChild(fragment);
     historyContent.scrollTop = historyContent.scrollHeight;
 }
 
+async function loadOlderHistory() {
+    if (historyLoading || !historyHasMore || conversationHistory.length === 0) return;
+    historyLoading = true;
+    try {
+        const oldestId = conversationHistory[0].id;
+        const response = await fetch(`${API_BASE_URL}/history?before=${oldestId}&limit=${HISTORY_PAGE_SIZE}`);
+        if (!response.ok) return;
+        const page = await response.json();
+        historyHasMore = page.has_more;
+
+        // Prepend without making the visible messages jump
+        const previousHeight = historyContent.scrollHeight;
+        const fragment = document.createDocumentFragment();
+        page.messages.forEach(item => fragment.appendChild(createHistoryItem(item)));
+        historyContent.prepend(fragment);
+        historyContent.scrollTop += historyContent.scrollHeight - previousHeight;
+        conversationHistory = page.messages.concat(conversationHistory);
+    } finally {
+        historyLoading = false;
+    }
+}
+
+// Fetch only the messages archived since the newest one we have
+async function syncHistory() {
+    if (conversationHistory.length === 0) return loadLatestHistory();
+    try {
+        let hasMore = true;
+        while (hasMore) {
+            const newestId = conversationHistory[conversationHistory.length - 1].id;
+            const response = await fetch(`${API_BASE_URL}/history?since=${newestId}&limit=${HISTORY_PAGE_SIZE}`);
+            if (!response.ok) return;
+            const page = await response.json();
+            page.messages.forEach(item => {
+                conversationHistory.push(item);
+                historyContent.appendChild(createHistoryItem(item));
+            });
+            hasMore = page.has_more;
+        }
+        historyContent.scrollTop = historyContent.scrollHeight;
+    } catch (e) {
+        console.error("History sync failed:", e);
+    }
+}
+
 function speak(text) {
     if ('speechSynthesis' in window) {
         window.speechSynthesis.cancel(); // Stop any current speech
@@ -110,6 +215,10 @@ closeHistory.addEventListener('click', () => {
     historyPanel.classList.add('hidden');
 });
 
+historyContent.addEventListener('scroll', () => {
+    if (historyContent.scrollTop < 50) loadOlderHistory();
+});
+
 sendBtn.addEventListener('click', () => handleCommand(userInput.value.trim()));
 
 userInput.addEventListener('keypress', (e) => {
@@ -358,14 +467,9 @@ window.onload = async () => {
     playStartupSound();
     ambientAudio.play().catch(() => { }); // Usually needs interaction
 
-    // Fetch persistent history...
+    // Fetch the latest page of persistent history
     try {
-        const response = await fetch(`${API_BASE_URL}/history`);
-        if (response.ok) {
-            const history = await response.json();
-            conversationHistory = history;
-            renderHistory();
-        }
+        await loadLatestHistory();
     } catch (e) {
         console.error("Could not load history:", e);
     }